@@ -0,0 +1,95 @@
+import re
+import math
+import logging
+from collections import Counter, defaultdict
+from langchain_core.documents import Document
+from .vector_store import IndexCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+# Standard Okapi BM25 parameters
+K1 = 1.5
+B = 0.75
+
+# Identifiers keep their -, _, :, / and . so "bg-blue-500", "md:flex" and
+# "react-router-dom" stay one term; their parts are indexed as well
+_term = re.compile(r"[A-Za-z0-9][A-Za-z0-9_\-:/.\[\]]*[A-Za-z0-9\]]|[A-Za-z0-9]")
+_part = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+")
+
+
+def tokenize(text: str):
+    """
+    Terms of a text for BM25: every identifier lowercased, plus its camelCase and
+    dash separated parts, so "useForm" matches both "useForm" and "form".
+    """
+    terms = []
+    for match in _term.findall(text):
+        term = match.lower()
+        terms.append(term)
+        parts = [part.lower() for part in _part.findall(match)]
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+class BM25Index:
+    """In-memory inverted index over the chunks of the vector db."""
+
+    def __init__(self, ids, documents, metadatas):
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = [metadata or {} for metadata in metadatas]
+        self.postings = defaultdict(list)
+        self.lengths = []
+        for position, document in enumerate(documents):
+            counts = Counter(tokenize(document))
+            self.lengths.append(sum(counts.values()))
+            for term, count in counts.items():
+                self.postings[term].append((position, count))
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        count = len(documents)
+        self.idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def __len__(self):
+        return len(self.documents)
+
+    def search(self, query: str, k: int, exclude_sources=()):
+        """Returns up to k (Document, score) pairs, best first."""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for position, count in self.postings[term]:
+                length_norm = 1 - B + B * self.lengths[position] / (self.average_length or 1)
+                scores[position] += idf * count * (K1 + 1) / (count + K1 * length_norm)
+
+        results = []
+        for position, score in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+            if self.metadatas[position].get("source") in exclude_sources:
+                continue
+            results.append((
+                Document(page_content=self.documents[position], metadata=self.metadatas[position], id=self.ids[position]),
+                score,
+            ))
+            if len(results) >= k:
+                break
+        return results
+
+
+def _build_index(vector_store):
+    result = vector_store.get(include=["documents", "metadatas"])
+    index = BM25Index(result["ids"], result["documents"] or [], result["metadatas"] or [])
+    logger.info(f"BM25 index: {len(index)} chunks, {len(index.postings)} terms")
+    return index
+
+
+# BM25 index of the whole collection
+bm25_index = IndexCache("BM25 index", _build_index)
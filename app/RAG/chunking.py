@@ -0,0 +1,156 @@
+import logging
+from collections import defaultdict
+from langchain.text_splitter import RecursiveCharacterTextSplitter, Language
+from langchain_core.documents import Document
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+# Target chunk size in characters. Small sections of a page are packed together up
+# to this size, larger ones are split at paragraph and code boundaries.
+CHUNK_SIZE = 1500
+# Template sources hold one component per record: never merged with another
+# component and only split if the component is larger than this
+COMPONENT_CHUNK_SIZE = 4000
+COMPONENT_SOURCES = {"Tailwindcss-Templates"}
+# Chunks shorter than this without any code carry too little to be worth a vector
+MIN_CHUNK_CHARS = 80
+# Smallest room left for the text of a chunk once its heading is prefixed
+MIN_UNIT_CHARS = 200
+
+# A line is boilerplate (nav, footer, "Edit this page") when it appears on at least
+# BOILERPLATE_PAGE_SHARE of the pages of a source, and on BOILERPLATE_MIN_PAGES or more
+BOILERPLATE_MIN_PAGES = 3
+BOILERPLATE_PAGE_SHARE = 0.5
+
+
+def _text_splitter(chunk_size: int):
+    # splits long paragraphs at sentence and word boundaries, with a little overlap
+    return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=min(100, chunk_size // 10))
+
+
+def _code_splitter(chunk_size: int):
+    # splits JSX/JS at top level declarations before falling back to lines
+    return RecursiveCharacterTextSplitter.from_language(Language.JS, chunk_size=chunk_size, chunk_overlap=0)
+
+
+def boilerplate_lines(records) -> set:
+    """Text lines repeated on most pages of a source."""
+    pages_by_line = defaultdict(set)
+    urls = set()
+    for record in records:
+        urls.add(record.get("url"))
+        for line in (record.get("text") or "").splitlines():
+            line = line.strip()
+            if line:
+                pages_by_line[line].add(record.get("url"))
+    if len(urls) < BOILERPLATE_MIN_PAGES:
+        return set()
+    threshold = max(BOILERPLATE_MIN_PAGES, len(urls) * BOILERPLATE_PAGE_SHARE)
+    return {line for line, pages in pages_by_line.items() if len(pages) >= threshold}
+
+
+def _fence(code: str) -> str:
+    return f"```\n{code}\n```"
+
+
+def _section_units(record: dict, boilerplate: set, chunk_size: int):
+    """Paragraphs and fenced code blocks of a section, each at most chunk_size long."""
+    lines = [line for line in (record.get("text") or "").splitlines() if line.strip() not in boilerplate]
+    units = []
+    text = "\n".join(lines).strip()
+    if text:
+        paragraphs = [paragraph.strip() for paragraph in text.split("\n\n") if paragraph.strip()]
+        for paragraph in paragraphs:
+            units.extend(_text_splitter(chunk_size).split_text(paragraph) if len(paragraph) > chunk_size else [paragraph])
+    for code in record.get("code_blocks") or []:
+        # a code sample stays whole when it fits, otherwise it is cut between declarations
+        if len(code) + 8 <= chunk_size:
+            units.append(_fence(code))
+        else:
+            units.extend(_fence(piece) for piece in _code_splitter(chunk_size - 8).split_text(code))
+    return units
+
+
+def _heading(record: dict, chunk_size: int) -> str:
+    # the heading path is repeated in every chunk of the section, a very long one is
+    # cut to a quarter of the chunk, keeping its most specific (last) levels
+    heading = " > ".join(record.get("heading_path") or [])
+    limit = chunk_size // 4
+    if len(heading) > limit:
+        heading = "..." + heading[-(limit - 3):]
+    return heading
+
+
+def _is_useful(content: str) -> bool:
+    return "```" in content or len(content) >= MIN_CHUNK_CHARS
+
+
+def chunk_records(records, source: str):
+    """
+    Turns the records of a source into chunks. Every chunk starts with the heading
+    path of its section and code blocks are never cut in the middle of a line. The
+    small sections of a page are packed into one chunk, template components get a
+    chunk each. Boilerplate lines and near empty chunks are left out.
+    """
+    records = list(records)
+    boilerplate = boilerplate_lines(records)
+    component_source = source in COMPONENT_SOURCES
+    chunk_size = COMPONENT_CHUNK_SIZE if component_source else CHUNK_SIZE
+
+    chunks = []
+    current = None
+
+    def flush():
+        nonlocal current
+        if current is not None and _is_useful(current["content"]):
+            chunks.append(Document(page_content=current["content"], metadata=current["metadata"]))
+        current = None
+
+    for record in records:
+        heading = _heading(record, chunk_size)
+        units = _section_units(record, boilerplate, max(MIN_UNIT_CHARS, chunk_size - len(heading) - 2))
+        if not units:
+            continue
+        metadata = {
+            "source": source,
+            "url": record.get("url") or "",
+            "title": record.get("title") or "",
+            "heading": heading,
+        }
+        section = "\n\n".join([heading] + units if heading else units)
+        # pack whole sections of the same page while they fit
+        if (
+            current is not None
+            and not component_source
+            and current["metadata"]["url"] == metadata["url"]
+            and len(current["content"]) + len(section) + 2 <= chunk_size
+        ):
+            current["content"] += "\n\n" + section
+            continue
+        flush()
+        if len(section) <= chunk_size:
+            current = {"content": section, "metadata": metadata}
+            continue
+        # the section alone is too large, split it between units and repeat the heading
+        for unit in units:
+            piece = f"{heading}\n\n{unit}" if heading else unit
+            if current is not None and len(current["content"]) + len(unit) + 2 <= chunk_size:
+                current["content"] += "\n\n" + unit
+            else:
+                flush()
+                current = {"content": piece, "metadata": dict(metadata)}
+        flush()
+    flush()
+
+    if boilerplate:
+        logger.info(f"{source}: dropped {len(boilerplate)} boilerplate lines")
+    return chunks
+
+
+def chunk_text(text: str, source: str):
+    """Chunks a legacy plain text dump, which has no headings or code boundaries."""
+    return chunk_records([{"url": "", "title": "", "heading_path": [], "text": text, "code_blocks": []}], source)
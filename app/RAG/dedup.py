@@ -0,0 +1,91 @@
+import re
+import hashlib
+import logging
+from collections import defaultdict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+# Near duplicates: 64 bit SimHash over word 3-grams, chunks whose fingerprints differ
+# in at most SIMHASH_MAX_DISTANCE bits are the same content with small edits
+SIMHASH_BITS = 64
+SIMHASH_MAX_DISTANCE = 6
+# Fingerprints are split into bands, two chunks are only compared if a band matches.
+# With 8 bands of 8 bits any pair within 6 bits shares at least two bands.
+SIMHASH_BANDS = 8
+SHINGLE_SIZE = 3
+# Below this many words a fingerprint is too noisy, only exact matches are removed
+SIMHASH_MIN_WORDS = 20
+
+_word = re.compile(r"\w+")
+
+
+def _body(chunk) -> str:
+    # chunks of different sections repeat the same content under another heading,
+    # so the heading line is left out of the comparison
+    content = chunk.page_content
+    heading = chunk.metadata.get("heading")
+    if heading and content.startswith(heading):
+        content = content[len(heading):]
+    return content
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def simhash(words) -> int:
+    shingles = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(max(1, len(words) - SHINGLE_SIZE + 1))]
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        # blake2b rather than hash(), fingerprints must not change between processes
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def _bands(fingerprint: int):
+    width = SIMHASH_BITS // SIMHASH_BANDS
+    mask = (1 << width) - 1
+    return [(band, fingerprint >> (band * width) & mask) for band in range(SIMHASH_BANDS)]
+
+
+def dedup_chunks(chunks):
+    """
+    Drops chunks whose content repeats an earlier chunk, exactly (after normalizing
+    case and whitespace) or nearly (SimHash). The first occurrence is kept.
+    Returns the kept chunks and a report of what was removed.
+    """
+    seen_hashes = set()
+    buckets = defaultdict(list)
+    kept = []
+    report = {"chunks_in": len(chunks), "exact_duplicates": 0, "near_duplicates": 0, "chars_removed": 0}
+
+    for chunk in chunks:
+        body = _normalize(_body(chunk))
+        digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        if digest in seen_hashes:
+            report["exact_duplicates"] += 1
+            report["chars_removed"] += len(chunk.page_content)
+            continue
+        seen_hashes.add(digest)
+
+        words = _word.findall(body)
+        if len(words) >= SIMHASH_MIN_WORDS:
+            fingerprint = simhash(words)
+            bands = _bands(fingerprint)
+            candidates = {other for band in bands for other in buckets[band]}
+            if any(bin(fingerprint ^ other).count("1") <= SIMHASH_MAX_DISTANCE for other in candidates):
+                report["near_duplicates"] += 1
+                report["chars_removed"] += len(chunk.page_content)
+                continue
+            for band in bands:
+                buckets[band].append(fingerprint)
+        kept.append(chunk)
+
+    report["chunks_out"] = len(kept)
+    return kept, report
@@ -0,0 +1,165 @@
+import os
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_ollama import OllamaEmbeddings
+from ..config import settings
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+EMBEDDING_MODEL = "nomic-embed-text:latest"
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+embedding_cache_path = os.path.join(current_dir, "db", "embedding_cache.sqlite3")
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model with a cache keyed by a hash of the model name and text.
+    Lookups go to an in-memory LRU first, then to a sqlite file on disk; only texts
+    found in neither are sent to the model, in batches of batch_size.
+    """
+
+    def __init__(self, underlying: Embeddings, model_name: str, cache_path: str,
+                 memory_size: int = 10000, batch_size: int = 64):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.cache_path = cache_path
+        self.memory_size = memory_size
+        self.batch_size = batch_size
+        self._memory = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self._db = None
+        self._db_lock = threading.Lock()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _connection(self):
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            self._db = sqlite3.connect(self.cache_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        return self._db
+
+    def _memory_get(self, keys):
+        found = {}
+        with self._memory_lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+        return found
+
+    def _memory_put(self, vectors: dict):
+        with self._memory_lock:
+            for key, vector in vectors.items():
+                self._memory[key] = vector
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _disk_get(self, keys):
+        found = {}
+        with self._db_lock:
+            db = self._connection()
+            # stay below sqlite's limit on query parameters
+            for start in range(0, len(keys), 500):
+                part = keys[start:start + 500]
+                rows = db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def _disk_put(self, vectors: dict):
+        with self._db_lock:
+            db = self._connection()
+            db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in vectors.items()]
+            )
+            db.commit()
+
+    def _lookup(self, keys):
+        found = self._memory_get(keys)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            from_disk = self._disk_get(missing)
+            self._memory_put(from_disk)
+            found.update(from_disk)
+        return found
+
+    def _misses(self, texts, keys, found):
+        # Each distinct uncached text is embedded once, even if it appears several times
+        misses = {}
+        for text, key in zip(texts, keys):
+            if key not in found and key not in misses:
+                misses[key] = text
+        return misses
+
+    def _store(self, computed: dict):
+        self._memory_put(computed)
+        self._disk_put(computed)
+
+    def embed_documents(self, texts):
+        keys = [self._key(text) for text in texts]
+        found = self._lookup(keys)
+        misses = self._misses(texts, keys, found)
+        if misses:
+            miss_keys = list(misses)
+            for start in range(0, len(miss_keys), self.batch_size):
+                batch_keys = miss_keys[start:start + self.batch_size]
+                vectors = self.underlying.embed_documents([misses[key] for key in batch_keys])
+                computed = dict(zip(batch_keys, vectors))
+                self._store(computed)
+                found.update(computed)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts):
+        keys = [self._key(text) for text in texts]
+        found = self._memory_get(keys)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            # sqlite reads are blocking, keep them off the event loop
+            from_disk = await asyncio.to_thread(self._disk_get, missing)
+            self._memory_put(from_disk)
+            found.update(from_disk)
+        misses = self._misses(texts, keys, found)
+        if misses:
+            miss_keys = list(misses)
+            for start in range(0, len(miss_keys), self.batch_size):
+                batch_keys = miss_keys[start:start + self.batch_size]
+                vectors = await self.underlying.aembed_documents([misses[key] for key in batch_keys])
+                computed = dict(zip(batch_keys, vectors))
+                self._memory_put(computed)
+                await asyncio.to_thread(self._disk_put, computed)
+                found.update(computed)
+        return [found[key] for key in keys]
+
+    async def aembed_query(self, text):
+        return (await self.aembed_documents([text]))[0]
+
+
+# Shared by the indexer and the code agent
+embeddings = CachedEmbeddings(
+    OllamaEmbeddings(model=EMBEDDING_MODEL),
+    model_name=EMBEDDING_MODEL,
+    cache_path=embedding_cache_path,
+    memory_size=settings.EMBEDDING_CACHE_SIZE,
+    batch_size=settings.EMBEDDING_BATCH_SIZE,
+)
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import functools
+from ..config import settings
+from .vector_store import get_vector_store
+from .bm25 import bm25_index as bm25_cache
+
+try:
+    from sentence_transformers import CrossEncoder
+except ImportError:  # optional, results are returned in fused order without it
+    CrossEncoder = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+# Reciprocal rank fusion constant, damps the weight of the very first ranks
+RRF_K = 60
+
+
+@functools.cache
+def get_reranker():
+    """The cross-encoder of RERANK_MODEL, or None if reranking is off or unavailable."""
+    if not settings.RERANK_MODEL:
+        return None
+    if CrossEncoder is None:
+        logger.warning("RERANK_MODEL is set but sentence-transformers is not installed, not reranking")
+        return None
+    try:
+        return CrossEncoder(settings.RERANK_MODEL)
+    except Exception as e:
+        logger.warning(f"Loading reranker {settings.RERANK_MODEL} failed ({e}), not reranking")
+        return None
+
+
+async def warm_reranker():
+    # loading downloads and initialises the model, keep it off the event loop
+    await asyncio.to_thread(get_reranker)
+
+
+def _doc_key(doc):
+    return doc.id or doc.page_content
+
+
+def reciprocal_rank_fusion(*rankings):
+    """Merges ranked document lists, a document scores 1 / (RRF_K + rank) per list it is in."""
+    scores = {}
+    documents = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, 1):
+            key = _doc_key(doc)
+            documents.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank)
+    return [documents[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+def _rerank(model, query: str, docs):
+    scores = model.predict([(query, doc.page_content) for doc in docs])
+    return [doc for _, doc in sorted(zip(scores, docs), key=lambda pair: pair[0], reverse=True)]
+
+
+async def hybrid_search(query: str, query_embedding, k: int = None, exclude_sources=()):
+    """
+    Retrieves RETRIEVAL_CANDIDATES chunks by vector similarity and by BM25 keyword
+    match (exact API names and class names), fuses both rankings with RRF and, if a
+    reranker is configured, reorders the fused candidates with it. Returns the best k.
+    """
+    k = k or settings.RETRIEVAL_K
+    candidates = max(k, settings.RETRIEVAL_CANDIDATES)
+    vector_store = get_vector_store()
+    search_filter = {"source": {"$nin": list(exclude_sources)}} if exclude_sources else None
+
+    vector_docs, bm25_index = await asyncio.gather(
+        vector_store.asimilarity_search_by_vector(embedding=query_embedding, k=candidates, filter=search_filter),
+        bm25_cache.get(),
+    )
+    keyword_docs = []
+    if bm25_index is not None:
+        keyword_docs = [
+            doc for doc, _ in await asyncio.to_thread(bm25_index.search, query, candidates, tuple(exclude_sources))
+        ]
+
+    fused = reciprocal_rank_fusion(vector_docs, keyword_docs)
+    reranker = await asyncio.to_thread(get_reranker) if settings.RERANK_MODEL else None
+    if reranker is not None and fused:
+        fused = await asyncio.to_thread(_rerank, reranker, query, fused[:candidates])
+    logger.info(f"Hybrid search: {len(vector_docs)} vector + {len(keyword_docs)} keyword hits, {len(fused)} fused, top {k} used")
+    return fused[:k]
@@ -0,0 +1,50 @@
+import logging
+import numpy as np
+from ..config import settings
+from .vector_store import IndexCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+STYLING_SOURCES = ["Tailwind-UI-Kit", "Tailwindcss-Templates"]
+
+
+def _load_styling_chunks(vector_store):
+    result = vector_store.get(
+        where={"source": {"$in": STYLING_SOURCES}},
+        include=["documents", "embeddings"]
+    )
+    documents = result["documents"] or []
+    logger.info(f"Styling reference: {len(documents)} chunks")
+    if not documents:
+        return [], None
+    matrix = np.asarray(result["embeddings"], dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return documents, matrix / norms
+
+
+# Styling chunks and their normalized embeddings
+styling_chunks = IndexCache("Styling reference", _load_styling_chunks, empty=([], None))
+
+
+async def get_styling_reference(query_embedding, top_k: int = None):
+    """
+    Returns the top_k styling chunks most similar to the prompt, best first. The
+    prompt's context assembler fits them into the styling token budget.
+    """
+    top_k = top_k or settings.STYLING_TOP_K
+    documents, matrix = await styling_chunks.get()
+    if not documents:
+        return []
+
+    query = np.asarray(query_embedding, dtype=np.float32)
+    query_norm = np.linalg.norm(query)
+    if query_norm:
+        query = query / query_norm
+    scores = matrix @ query
+    ranked = np.argsort(-scores)[:top_k]
+    return [documents[index] for index in ranked]
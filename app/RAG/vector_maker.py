@@ -1,73 +1,285 @@
 import os
-from langchain.text_splitter import CharacterTextSplitter
+import json
+import time
+import hashlib
 from langchain_chroma import Chroma
-from langchain_ollama import OllamaEmbeddings
-from langchain_community.document_loaders import UnstructuredFileLoader
+from .embeddings import embeddings
+from .chunking import chunk_records, chunk_text
+from .dedup import dedup_chunks
 import logging
 import glob
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from ..config import settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
 # Get the root logger
 logger = logging.getLogger()
-# Create embedding instance using Ollama
-embeddings = OllamaEmbeddings(model="nomic-embed-text:latest")
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 extracted_data_dir = os.path.join(current_dir, "..", "docs_scrapers", "extracted_data")
-file_paths = glob.glob(os.path.join(extracted_data_dir,"*.txt"))
 
 # Create path for storing the vector database
-message=""
 persistent_directory = os.path.join(current_dir, "db", "chroma_db")
-def vector_maker():
-    logger.info("Calling vector_maker function")
-    if not os.path.exists(persistent_directory):
-        logger.info("Persistent directory does not exist. Creating it...")
-        # Create the directory and its parents
-        os.makedirs(persistent_directory, exist_ok=True)
-        if not os.path.exists(extracted_data_dir):
-            raise FileNotFoundError(
-                f"The file {extracted_data_dir} does not exist. Please check the path."
-            )
-        if len(file_paths)==0 or len(file_paths)!=7:
-            raise ValueError(
-                f"Expected 5 text files, but found {len(file_paths)}. Please create the missing files."
+EXPECTED_SOURCE_COUNT = 7
+# Bump when loading/splitting changes, so unchanged files are re-chunked once
+INDEX_FORMAT_VERSION = 5
+# Hash of each indexed file, kept inside the db directory so it goes away with the db
+manifest_path = os.path.join(persistent_directory, "index_manifest.json")
+
+
+def source_from_file(file_path: str) -> str:
+    # Extracted_<Source>_doc.jsonl (or a legacy .txt) -> <Source>
+    file_name = os.path.basename(file_path)
+    name_only = file_name.rsplit(".", 1)[0]
+    return name_only.split("_")[1]
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_hash(file_path: str) -> str:
+    digest = hashlib.sha256(f"{INDEX_FORMAT_VERSION}\0".encode("utf-8"))
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest():
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest: dict):
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def iter_records(file_path: str):
+    """Streams the records of an extracted .jsonl file, one per line."""
+    with open(file_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping malformed record {file_path}:{line_number}")
+
+
+def load_chunks(file_path: str, source: str):
+    """Chunks of the file with duplicates removed, and the dedup report."""
+    logger.info(f"Loading file: {file_path}")
+    if file_path.endswith(".jsonl"):
+        chunks = chunk_records(iter_records(file_path), source)
+    else:
+        # legacy plain text dump of a whole source
+        with open(file_path, encoding="utf-8") as f:
+            chunks = chunk_text(f.read(), source)
+    # repeated sidebars, notes and snippets are dropped before anything is embedded
+    chunks, report = dedup_chunks(chunks)
+    logger.info(f"Deduplicated {source}: {report}")
+    return chunks, report
+
+
+def write_batches(db: Chroma, ids, texts, metadatas, embed_pool: ThreadPoolExecutor, on_batch=None):
+    """
+    Embeds the chunks in batches of INDEX_EMBED_BATCH_SIZE on embed_pool, with at most
+    INDEX_EMBED_CONCURRENCY batches in flight, and upserts each batch into Chroma as
+    soon as its embeddings are back, so only a few batches are held in memory.
+    """
+    batch_size = settings.INDEX_EMBED_BATCH_SIZE
+    in_flight = {}
+
+    def write_done(done):
+        for future in done:
+            start = in_flight.pop(future)
+            end = start + batch_size
+            # writes stay on this thread, only the embedding calls run in parallel
+            db._collection.upsert(
+                ids=ids[start:end],
+                embeddings=future.result(),
+                documents=texts[start:end],
+                metadatas=metadatas[start:end],
             )
-        all_documents=[]
-        # Load the text file
-        meta_data_docs_name=[]
-        for file in file_paths:
-            logger.info(f"Loading file: {file}")
-            # Create an UnstructuredFileLoader for the file and load its contents.
-            loader= UnstructuredFileLoader(file)
-            docs=loader.load()
-            for doc in docs:
-                logger.info("Setting metadata for the document")
-                file_name= os.path.basename(file)
-                name_only=file_name.rsplit(".",1)[0]
-                name_parts=name_only.split("_")
-                doc.metadata["source"]=name_parts[1]
-                logger.info("**Metadata set for the document**")
-                logger.info(f"Metadata source: {doc.metadata['source']}")
-                meta_data_docs_name.append(name_parts[1])
-
-            text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-            split_docs = text_splitter.split_documents(docs)
-            all_documents.extend(split_docs)
-        # Create the vector store
-        logger.info("Creating vector store")
-        db = Chroma.from_documents(
-            documents=all_documents,
-            embedding=embeddings,
-            persist_directory=persistent_directory
+            if on_batch is not None:
+                on_batch(len(ids[start:end]))
+
+    for start in range(0, len(ids), batch_size):
+        if len(in_flight) >= settings.INDEX_EMBED_CONCURRENCY:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            write_done(done)
+        future = embed_pool.submit(embeddings.embed_documents, texts[start:start + batch_size])
+        in_flight[future] = start
+    while in_flight:
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        write_done(done)
+
+
+def index_source(db: Chroma, source: str, chunks, embed_pool: ThreadPoolExecutor, on_batch=None):
+    """
+    Brings the chunks of one source in the index up to date. Chunk ids are
+    "<source>:<content hash>", so a chunk keeps its id wherever it moves in the file:
+    only chunks with a new id are embedded and ids that no longer exist are deleted.
+    A new chunk replacing a deleted one of the same page section counts as updated.
+    """
+    existing = db.get(where={"source": source}, include=["metadatas"])
+    existing_metadatas = {
+        chunk_id: metadata or {} for chunk_id, metadata in zip(existing["ids"], existing["metadatas"])
+    }
+
+    ids, texts, metadatas = [], [], []
+    current_ids = set()
+    for chunk in chunks:
+        chunk_hash = content_hash(chunk.page_content)
+        chunk_id = f"{source}:{chunk_hash}"
+        if chunk_id in current_ids:
+            continue
+        current_ids.add(chunk_id)
+        if chunk_id in existing_metadatas:
+            continue
+        ids.append(chunk_id)
+        texts.append(chunk.page_content)
+        metadatas.append({**chunk.metadata, "source": source, "content_hash": chunk_hash})
+
+    if ids:
+        write_batches(db, ids, texts, metadatas, embed_pool, on_batch)
+
+    stale_ids = [chunk_id for chunk_id in existing_metadatas if chunk_id not in current_ids]
+    if stale_ids:
+        db.delete(ids=stale_ids)
+
+    # pair new and deleted chunks by page section (url, heading) to tell edits from additions
+    def section(metadata):
+        return metadata.get("url"), metadata.get("heading")
+
+    removed_sections = Counter(section(existing_metadatas[chunk_id]) for chunk_id in stale_ids)
+    updated = 0
+    for metadata in metadatas:
+        if removed_sections[section(metadata)] > 0:
+            removed_sections[section(metadata)] -= 1
+            updated += 1
+    stats = {
+        "added": len(ids) - updated,
+        "updated": updated,
+        "removed": len(stale_ids) - updated,
+        "unchanged": len(current_ids) - len(ids),
+    }
+    logger.info(f"Indexed {source}: {stats}")
+    return stats
+
+
+def vector_maker(sources=None, progress=None):
+    """
+    Updates the vector database from the extracted docs. Pass a list of sources
+    (e.g. ["React-Router"]) to refresh only those, otherwise every extracted file
+    is indexed and sources without a file are removed from the index. Files that
+    did not change since they were last indexed are skipped without being loaded.
+    progress, if given, is called with the counters of the build as it goes.
+    Returns the number of added, updated, removed and unchanged chunks, and how
+    many duplicate chunks were dropped per source.
+    """
+    logger.info("Calling vector_maker function")
+    if not os.path.exists(extracted_data_dir):
+        raise FileNotFoundError(
+            f"The file {extracted_data_dir} does not exist. Please check the path."
         )
-        logger.info(f"Vector store created and saved to {persistent_directory}")
-        message="Vector store created and saved"
-        for i in meta_data_docs_name:
-            logger.info(f"Document source: {i}")
-        return message
-    else:
-        message="Persistent directory already exists."
-        return message
+    file_paths = sorted(
+        glob.glob(os.path.join(extracted_data_dir, "*.txt")) + glob.glob(os.path.join(extracted_data_dir, "*.jsonl")),
+        # a .jsonl file wins over a legacy .txt file of the same source
+        key=lambda file: file.endswith(".jsonl"),
+    )
+    files_by_source = {source_from_file(file): file for file in file_paths}
+    if sources:
+        missing = [source for source in sources if source not in files_by_source]
+        if missing:
+            raise ValueError(f"No extracted file found for: {', '.join(missing)}")
+        files_by_source = {source: files_by_source[source] for source in sources}
+    elif len(files_by_source) != EXPECTED_SOURCE_COUNT:
+        raise ValueError(
+            f"Expected {EXPECTED_SOURCE_COUNT} extracted files, but found {len(files_by_source)}. Please create the missing files."
+        )
+
+    os.makedirs(persistent_directory, exist_ok=True)
+    db = Chroma(
+        persist_directory=persistent_directory,
+        embedding_function=embeddings,
+    )
+
+    manifest = load_manifest()
+    totals = {
+        "added": 0, "updated": 0, "removed": 0, "unchanged": 0, "skipped_sources": 0,
+        "exact_duplicates": 0, "near_duplicates": 0, "duplicate_chars_removed": 0,
+        # dedup report of every source that was loaded
+        "dedup": {},
+    }
+    started = time.perf_counter()
+    counters = {"files_loaded": 0, "chunks_embedded": 0}
+
+    def report():
+        if progress is not None:
+            elapsed = time.perf_counter() - started
+            progress(
+                files_total=len(files_by_source),
+                files_loaded=counters["files_loaded"],
+                chunks_embedded=counters["chunks_embedded"],
+                chunks_per_second=round(counters["chunks_embedded"] / elapsed, 2) if elapsed else 0.0,
+            )
+
+    def on_batch(count):
+        counters["chunks_embedded"] += count
+        report()
+
+    # Files are loaded and split in parallel, each source is indexed as soon as it is ready
+    with ThreadPoolExecutor(max_workers=settings.INDEX_LOAD_WORKERS) as load_pool, \
+            ThreadPoolExecutor(max_workers=settings.INDEX_EMBED_CONCURRENCY) as embed_pool:
+        loading = {}
+        for source, file in files_by_source.items():
+            digest = file_hash(file)
+            indexed = manifest.get(source)
+            if indexed and indexed["file_hash"] == digest:
+                logger.info(f"{source} unchanged since the last build, skipping")
+                totals["unchanged"] += indexed["chunks"]
+                totals["skipped_sources"] += 1
+                counters["files_loaded"] += 1
+                continue
+            loading[load_pool.submit(load_chunks, file, source)] = (source, digest)
+        report()
+        for future in as_completed(loading):
+            source, digest = loading[future]
+            chunks, dedup_report = future.result()
+            totals["dedup"][source] = dedup_report
+            totals["exact_duplicates"] += dedup_report["exact_duplicates"]
+            totals["near_duplicates"] += dedup_report["near_duplicates"]
+            totals["duplicate_chars_removed"] += dedup_report["chars_removed"]
+            counters["files_loaded"] += 1
+            report()
+            stats = index_source(db, source, chunks, embed_pool, on_batch)
+            for key, count in stats.items():
+                totals[key] += count
+            manifest[source] = {"file_hash": digest, "chunks": len(chunks)}
+            save_manifest(manifest)
+
+    if not sources:
+        # Chunks of sources that no longer have an extracted file
+        orphaned = db.get(where={"source": {"$nin": list(files_by_source)}}, include=[])["ids"]
+        if orphaned:
+            db.delete(ids=orphaned)
+            totals["removed"] += len(orphaned)
+        for source in [source for source in manifest if source not in files_by_source]:
+            del manifest[source]
+        save_manifest(manifest)
+
+    logger.info(f"Vector store updated and saved to {persistent_directory}: {totals}")
+    return totals
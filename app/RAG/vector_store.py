@@ -0,0 +1,119 @@
+import os
+import asyncio
+import logging
+from langchain_chroma import Chroma
+from .embeddings import embeddings
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+persistent_directory = os.path.join(current_dir, "db", "chroma_db")
+
+# One Chroma handle shared by every request in the process. Requests only read
+# the reference, and a reload swaps it in one assignment, so a request that
+# already holds the old handle simply finishes with it.
+_vector_store = None
+_index_version = None
+_reload_lock = asyncio.Lock()
+# Caches derived from the index, rebuilt for every new index version
+_index_caches = []
+
+
+def _open_vector_store():
+    if not os.path.exists(persistent_directory):
+        return None
+    return Chroma(
+        persist_directory=persistent_directory,
+        embedding_function=embeddings,
+    )
+
+
+def _read_index_version():
+    # Changes whenever the index is written, and is the same for every worker process
+    # and across restarts, so it can key caches kept outside the process (redis)
+    sqlite_file = os.path.join(persistent_directory, "chroma.sqlite3")
+    stamp_path = sqlite_file if os.path.exists(sqlite_file) else persistent_directory
+    return str(os.stat(stamp_path).st_mtime_ns)
+
+
+async def load_vector_store():
+    """Opens the vector db once, called from the app lifespan on startup."""
+    global _vector_store, _index_version
+    async with _reload_lock:
+        if _vector_store is not None:
+            return _vector_store
+        # Opening Chroma reads the sqlite/HNSW files from disk, keep it off the event loop
+        _vector_store = await asyncio.to_thread(_open_vector_store)
+        if _vector_store is None:
+            logger.warning("No vector database found. Generate vectors before using the agent.")
+        else:
+            _index_version = _read_index_version()
+            logger.info(f"Vector store loaded (index version {_index_version})")
+        return _vector_store
+
+
+async def reload_vector_store():
+    """Reopens the vector db after /generate-vector rebuilt it and swaps the shared handle."""
+    global _vector_store, _index_version
+    async with _reload_lock:
+        new_store = await asyncio.to_thread(_open_vector_store)
+        _vector_store = new_store
+        _index_version = _read_index_version() if new_store is not None else None
+        logger.info(f"Vector store reloaded (index version {_index_version})")
+    # rebuild what is derived from the index now rather than on the next request
+    await warm_index_caches()
+    return _vector_store
+
+
+def get_vector_store():
+    return _vector_store
+
+
+def get_index_version():
+    return _index_version
+
+
+class IndexCache:
+    """
+    Data derived from the vector db (BM25 index, styling embeddings), built by
+    build(vector_store) in a worker thread once per index version. Requests that
+    come in while it is being built wait for that build instead of starting another.
+    """
+
+    def __init__(self, name: str, build, empty=None):
+        self.name = name
+        self.build = build
+        self.empty = empty
+        self._version = None
+        self._value = empty
+        self._lock = asyncio.Lock()
+        _index_caches.append(self)
+
+    async def get(self):
+        version = _index_version
+        if self._version == version:
+            return self._value
+        async with self._lock:
+            # another request may have built it while we waited
+            if self._version != version:
+                vector_store = _vector_store
+                if vector_store is None:
+                    return self.empty
+                value = await asyncio.to_thread(self.build, vector_store)
+                self._version, self._value = version, value
+                logger.info(f"{self.name} built (index version {version})")
+        return self._value
+
+
+async def warm_index_caches():
+    await asyncio.gather(*(cache.get() for cache in _index_caches))
+
+
+def close_vector_store():
+    global _vector_store, _index_version
+    _vector_store = None
+    _index_version = None
@@ -1,13 +1,20 @@
-import os
 from ..config import settings
-from langchain_chroma import Chroma
-from langchain_ollama import OllamaEmbeddings,OllamaLLM,ChatOllama
-from langchain.memory import ConversationSummaryBufferMemory
+from ..RAG.vector_store import get_vector_store, embeddings
+from ..RAG.styling_reference import get_styling_reference, STYLING_SOURCES
+from ..RAG.retriever import hybrid_search
+from langchain_ollama import OllamaLLM,ChatOllama
 from langchain_community.chat_message_histories import RedisChatMessageHistory
 from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage, AIMessage
+import time
+import asyncio
 import logging
 import base64
-from openai import OpenAI
+from ..redis_client import redis_client
+from . import semantic_cache
+from .summarizer import get_summary, truncate_messages, schedule_summary_update
+from .context import assemble_context, count_tokens, CONTEXT_MODEL
+from ..metrics import timed_stage, code_agent_stage_seconds
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,90 +24,72 @@ logger = logging.getLogger()
 
 
 redis_url=settings.REDIS_URL
-embeddings = OllamaEmbeddings(model="nomic-embed-text:latest")
 
 llm=ChatOpenAI(
-    model="gpt-5-mini",
+    model=CONTEXT_MODEL,
     api_key=settings.OPENAI_API_KEY
 )
 # If you want to use Ollama model, uncomment below and comment above llm
 #llm = ChatOllama(model="deepseek-r1:8b")
 
-current_dir = os.path.dirname(os.path.abspath(__file__))
-db_dir = os.path.join(current_dir, "db")
-persistent_directory = os.path.abspath(os.path.join(current_dir, "..", "RAG", "db", "chroma_db"))
+NO_VECTOR_DB_MESSAGE = "No vector database found. Please generate vectors first."
 
-async def code_agent(prompt:str, session_id: str):
-    if not os.path.exists(persistent_directory):
-        return "No vector database found. Please generate vectors first."
-    # loading the vector db
-    vector_store = Chroma(
-        persist_directory=persistent_directory,
-        embedding_function=embeddings,
-    )
-
-    tailwind_ui_kit = vector_store.get(where={"source": "Tailwind-UI-Kit"}, include=["documents"])["documents"]
-    tailwind_templates = vector_store.get(where={"source": "Tailwindcss-Templates"}, include=["documents"])["documents"]
-
-    styling_examples = "\n".join(tailwind_ui_kit + tailwind_templates)
+async def prepare_turn(prompt:str, session_id: str):
+    """
+    Embeds the prompt and opens the redis chat history of the session.
+    Returns None if the vector db has not been generated yet.
+    """
+    # shared vector db handle, opened once at startup
+    if get_vector_store() is None:
+        return None
 
-    # Fetch top-k matches for user prompt from other docs
-    relevant_docs = vector_store.similarity_search(
-        query=prompt,
-        k=6,
-        filter={"source": {"$nin": ["Tailwind-UI-Kit", "Tailwindcss-Templates"]}}
-    )
-    other_context = "\n".join([doc.page_content for doc in relevant_docs])
+    # Embed the prompt once and reuse it for the cache and both lookups
+    with timed_stage("embed"):
+        query_embedding = await embeddings.aembed_query(prompt)
+    chat_history = RedisChatMessageHistory(session_id=session_id, url=redis_url)
+    # Cached answers only fit the first prompt of a session, follow-ups depend on the chat so far
+    use_cache = settings.SEMANTIC_CACHE_ENABLED and not await redis_client.exists(chat_history.key)
+    return query_embedding, chat_history, use_cache
+
+async def build_prompt(prompt:str, session_id: str, query_embedding, chat_history: RedisChatMessageHistory):
+    """Retrieves the vector context and chat history for the prompt and returns the final LLM prompt."""
+    # Only the styling chunks closest to the prompt
+    with timed_stage("styling"):
+        styling_documents = await get_styling_reference(query_embedding)
+
+    # Top matches from other docs, by meaning and by exact API / class names
+    with timed_stage("retrieval"):
+        relevant_docs = await hybrid_search(prompt, query_embedding, exclude_sources=STYLING_SOURCES)
+    # Running summary kept up to date after every response, no LLM call needed here.
+    # The summary update of the last exchange may still be running (here or on another
+    # worker), so the last USER/AI exchange is always added as it was sent
+    with timed_stage("history"):
+        summary, prev_messages = await asyncio.gather(get_summary(session_id), chat_history.aget_messages())
+        latest_text = None
+        if prev_messages:
+            latest_text = truncate_messages("\n".join(
+                [f"{msg.type.upper()}: {msg.content}" for msg in prev_messages[-2:]]
+            ))
+        if summary:
+            logger.info("Using running summary of the session as chat history")
+            prev_messages_text = f"SUMMARY OF EARLIER MESSAGES: {summary}"
+            if latest_text:
+                prev_messages_text += f"\nLATEST MESSAGES:\n{latest_text}"
+        else:
+            prev_messages_text = latest_text
+
+    # Styling reference, docs and history cut to their token budgets, best ranked first
+    with timed_stage("context"):
+        assembled = assemble_context(styling_documents, [doc.page_content for doc in relevant_docs], prev_messages_text)
+    prev_messages_text = assembled["history"]
     context = f"""
     [STYLING REFERENCE — UI Kit & Templates, use only as design inspiration]
-    {styling_examples}
+    {assembled["styling"]}
 
     [OTHER RELEVANT DOCS — React,Tailwindcss , React Router, Axios]
-    {other_context}
+    {assembled["docs"]}
     """
 
-    chat_history = RedisChatMessageHistory(session_id=session_id, url=redis_url)
-
-    memory = ConversationSummaryBufferMemory(
-        llm=llm,
-        memory_key="chat_history",
-        chat_memory=chat_history,
-        max_token_limit=3500,
-        return_messages=True
-    )
-
-    prev_messages = await memory.chat_memory.aget_messages()
-    if prev_messages:
-        if len(prev_messages) >= 1:
-            prev_messages = prev_messages[-2:] if len(prev_messages) >= 2 else prev_messages
-        prev_messages_text = "\n".join(
-            [f"{msg.type.upper()}: {msg.content}" for msg in prev_messages]
-        )
-        logger.info("Previous messages fetched from chat history:")
-        # Summarizing the previous messages
-        logger.info("Summarizing previous messages for context...")
-        summarizer=OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=settings.SUMMARIZER_API,
-        )
-        completion = summarizer.chat.completions.create(
-            model="deepseek/deepseek-r1-0528-qwen3-8b:free",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a helpful assistant that summarizes chat messages between USER and AI. "
-                        "Keep the summary concise and focused on the main topics discussed.\n"
-                        f"{prev_messages_text}"
-                    ),
-                }
-            ]
-        )
-        prev_messages_text = completion.choices[0].message.content
-        logger.info(f"Summary of previous messages:\n {prev_messages_text}")
-    else:
-        prev_messages_text = None
-
     final_prompt = f"""
             You are a Senior React + TailwindCSS engineer. Output a complete, production-ready React app based on the USER REQUIREMENT. Use .jsx file extensions for all React components and JavaScript files containing React code.
 
@@ -163,13 +152,81 @@ async def code_agent(prompt:str, session_id: str):
             - Complete, executable app only. No explanations outside the output format.
         """
 
-    # Query DeepSeek model
-    logger.info("LLM called")
-    logger.info(f"Context Length: {len(context)} characters")
-    response =await llm.ainvoke(final_prompt)
-    chat_history.add_user_message(prompt)
-    chat_history.add_ai_message(str(response.content))
+    logger.info(
+        f"Prompt: {count_tokens(final_prompt)} tokens, context {assembled['tokens']} "
+        f"with {assembled['documents']} documents"
+    )
+    return final_prompt
+
+async def save_chat(chat_history: RedisChatMessageHistory, prompt: str, response: str):
+    with timed_stage("persistence"):
+        await chat_history.aadd_messages([HumanMessage(content=prompt), AIMessage(content=response)])
     logger.info("Chat stored in redis")
-    if hasattr(response, "content"):
-        return response.content
-    return str(response)
+    schedule_summary_update(chat_history.session_id, prompt, response)
+
+async def code_agent(prompt:str, session_id: str):
+    turn = await prepare_turn(prompt, session_id)
+    if turn is None:
+        return NO_VECTOR_DB_MESSAGE
+    query_embedding, chat_history, use_cache = turn
+
+    if use_cache:
+        with timed_stage("semantic_cache"):
+            cached = await semantic_cache.lookup(query_embedding)
+        if cached is not None:
+            await save_chat(chat_history, prompt, cached)
+            return cached
+
+    final_prompt = await build_prompt(prompt, session_id, query_embedding, chat_history)
+    logger.info("LLM called")
+    with timed_stage("llm"):
+        response =await llm.ainvoke(final_prompt)
+    content = str(response.content) if hasattr(response, "content") else str(response)
+    await save_chat(chat_history, prompt, content)
+    if use_cache:
+        await semantic_cache.store(query_embedding, prompt, content)
+    return content
+
+async def code_agent_stream(prompt:str, session_id: str):
+    """
+    Same as code_agent but yields the response as the LLM generates it. The chat is only
+    stored in redis once the whole response has been generated; if the consumer stops
+    early (client disconnected) the LLM request is closed and nothing is stored.
+    """
+    turn = await prepare_turn(prompt, session_id)
+    if turn is None:
+        yield NO_VECTOR_DB_MESSAGE
+        return
+    query_embedding, chat_history, use_cache = turn
+
+    if use_cache:
+        with timed_stage("semantic_cache"):
+            cached = await semantic_cache.lookup(query_embedding)
+        if cached is not None:
+            await save_chat(chat_history, prompt, cached)
+            yield cached
+            return
+
+    final_prompt = await build_prompt(prompt, session_id, query_embedding, chat_history)
+    logger.info("LLM called (streaming)")
+    chunks = []
+    llm_stream = llm.astream(final_prompt)
+    # timed by hand, the time the consumer takes to send each chunk is part of it
+    started = time.perf_counter()
+    try:
+        async for chunk in llm_stream:
+            if not chunk.content:
+                continue
+            text = str(chunk.content)
+            if not chunks:
+                code_agent_stage_seconds.observe(time.perf_counter() - started, stage="llm_first_token")
+            chunks.append(text)
+            yield text
+    finally:
+        # closes the HTTP stream to the LLM provider when we stop early
+        await llm_stream.aclose()
+        code_agent_stage_seconds.observe(time.perf_counter() - started, stage="llm")
+    content = "".join(chunks)
+    await save_chat(chat_history, prompt, content)
+    if use_cache:
+        await semantic_cache.store(query_embedding, prompt, content)
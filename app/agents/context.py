@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import functools
+from ..config import settings
+
+try:
+    import tiktoken
+except ImportError:  # optional, token counts are estimated without it
+    tiktoken = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+# Model the prompt is built for, its tokenizer is used to count tokens
+CONTEXT_MODEL = "gpt-5-mini"
+# Below this many tokens left, a document that does not fit is skipped rather than cut
+MIN_TRUNCATED_TOKENS = 100
+
+
+@functools.cache
+def get_encoding():
+    """
+    The tiktoken encoding of CONTEXT_MODEL, or None if tiktoken is not installed or its
+    encoding files cannot be loaded (they are downloaded on first use).
+    """
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(CONTEXT_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable ({e}), estimating token counts")
+        return None
+
+
+async def warm_tokenizer():
+    # loading may download the encoding, keep it off the event loop
+    await asyncio.to_thread(get_encoding)
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = get_encoding()
+    if encoding is None:
+        # Rough estimate, ~4 characters per token for English text and code
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, keep_end: bool = False) -> str:
+    """Cuts text to max_tokens, keeping its start (or its end with keep_end)."""
+    if max_tokens <= 1:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = get_encoding()
+    if encoding is None:
+        max_chars = (max_tokens - 1) * 4
+        return "..." + text[-max_chars:] if keep_end else text[:max_chars] + "..."
+    # one token is left for the "..." marking the cut
+    tokens = encoding.encode(text, disallowed_special=())
+    if keep_end:
+        return "..." + encoding.decode(tokens[-(max_tokens - 1):])
+    return encoding.decode(tokens[:max_tokens - 1]) + "..."
+
+
+def fit_documents(documents, budget: int):
+    """
+    Takes documents in rank order while they fit in the budget. A document that
+    does not fit is cut to the remaining budget if enough is left, otherwise skipped
+    so a smaller lower ranked one can still fit. Returns the documents and tokens used.
+    """
+    selected = []
+    used = 0
+    for document in documents:
+        remaining = budget - used
+        if remaining <= 0:
+            break
+        tokens = count_tokens(document)
+        if tokens > remaining:
+            if remaining < MIN_TRUNCATED_TOKENS:
+                continue
+            document = truncate_tokens(document, remaining)
+            tokens = count_tokens(document)
+        selected.append(document)
+        used += tokens
+    return selected, used
+
+
+def assemble_context(styling_documents, documents, history):
+    """
+    Fits the prompt context into CONTEXT_TOKEN_BUDGET. History and styling reference
+    get at most HISTORY_TOKEN_BUDGET and STYLING_TOKEN_BUDGET, the retrieved docs get
+    DOCS_TOKEN_BUDGET plus whatever the other two left unused. Documents are expected
+    best first. Returns the styling reference, docs and history text, and token counts.
+    """
+    total_budget = settings.CONTEXT_TOKEN_BUDGET
+
+    history_text = None
+    history_tokens = 0
+    if history:
+        # the end of the conversation matters most for the next turn
+        history_text = truncate_tokens(history, min(settings.HISTORY_TOKEN_BUDGET, total_budget), keep_end=True)
+        history_tokens = count_tokens(history_text)
+
+    styling_budget = min(settings.STYLING_TOKEN_BUDGET, total_budget - history_tokens)
+    styling_selected, styling_tokens = fit_documents(styling_documents, styling_budget)
+
+    unused = (settings.HISTORY_TOKEN_BUDGET - history_tokens) + (styling_budget - styling_tokens)
+    docs_budget = min(settings.DOCS_TOKEN_BUDGET + max(0, unused), total_budget - history_tokens - styling_tokens)
+    docs_selected, docs_tokens = fit_documents(documents, docs_budget)
+
+    return {
+        "styling": "\n".join(styling_selected),
+        "docs": "\n".join(docs_selected),
+        "history": history_text,
+        "tokens": {"styling": styling_tokens, "docs": docs_tokens, "history": history_tokens},
+        "documents": {"styling": len(styling_selected), "docs": len(docs_selected)},
+    }
@@ -0,0 +1,139 @@
+import time
+import uuid
+import base64
+import logging
+import numpy as np
+from ..config import settings
+from ..redis_client import redis_client
+from ..RAG.vector_store import get_index_version
+from ..metrics import semantic_cache_lookups_total
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+# Redis layout, scoped by index version so a rebuilt index never serves old answers:
+#   semantic_cache:<version>:entries       sorted set of entry ids, scored by last use (LRU)
+#   semantic_cache:<version>:entry:<id>    hash with the prompt embedding and response (expires after TTL)
+#   semantic_cache:hits / :misses          counters for the hit rate
+CACHE_PREFIX = "semantic_cache"
+HITS_KEY = f"{CACHE_PREFIX}:hits"
+MISSES_KEY = f"{CACHE_PREFIX}:misses"
+
+# Decoded embeddings by entry id, entries never change once written
+_embedding_memo = {}
+
+
+def _entries_key(version: str):
+    return f"{CACHE_PREFIX}:{version}:entries"
+
+
+def _entry_key(version: str, entry_id: str):
+    return f"{CACHE_PREFIX}:{version}:entry:{entry_id}"
+
+
+def _encode_embedding(embedding) -> str:
+    return base64.b64encode(np.asarray(embedding, dtype=np.float32).tobytes()).decode("ascii")
+
+
+def _decode_embedding(value: str):
+    return np.frombuffer(base64.b64decode(value), dtype=np.float32)
+
+
+def _normalize(embedding):
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+async def _load_embeddings(version: str, entry_ids: list):
+    missing = [entry_id for entry_id in entry_ids if entry_id not in _embedding_memo]
+    if missing:
+        pipe = redis_client.pipeline()
+        for entry_id in missing:
+            pipe.hget(_entry_key(version, entry_id), "embedding")
+        for entry_id, value in zip(missing, await pipe.execute()):
+            if value is not None:
+                _embedding_memo[entry_id] = _normalize(_decode_embedding(value))
+
+    expired = [entry_id for entry_id in entry_ids if entry_id not in _embedding_memo]
+    if expired:
+        await redis_client.zrem(_entries_key(version), *expired)
+    # forget entries that were evicted or expired
+    live_ids = set(entry_ids)
+    for entry_id in [entry_id for entry_id in _embedding_memo if entry_id not in live_ids]:
+        del _embedding_memo[entry_id]
+    return [entry_id for entry_id in entry_ids if entry_id in _embedding_memo]
+
+
+async def lookup(query_embedding):
+    """Returns a cached response for a prompt similar enough to this one, or None."""
+    version = get_index_version()
+    if not settings.SEMANTIC_CACHE_ENABLED or version is None:
+        return None
+
+    entry_ids = await redis_client.zrange(_entries_key(version), 0, -1)
+    entry_ids = await _load_embeddings(version, entry_ids)
+    if entry_ids:
+        matrix = np.stack([_embedding_memo[entry_id] for entry_id in entry_ids])
+        scores = matrix @ _normalize(query_embedding)
+        best = int(np.argmax(scores))
+        if scores[best] >= settings.SEMANTIC_CACHE_THRESHOLD:
+            entry_id = entry_ids[best]
+            response = await redis_client.hget(_entry_key(version, entry_id), "response")
+            if response is not None:
+                await redis_client.zadd(_entries_key(version), {entry_id: time.time()})
+                await redis_client.incr(HITS_KEY)
+                semantic_cache_lookups_total.inc(result="hit")
+                logger.info(f"Semantic cache hit (similarity {scores[best]:.3f})")
+                return response
+
+    await redis_client.incr(MISSES_KEY)
+    semantic_cache_lookups_total.inc(result="miss")
+    return None
+
+
+async def store(query_embedding, prompt: str, response: str):
+    version = get_index_version()
+    if not settings.SEMANTIC_CACHE_ENABLED or version is None:
+        return
+
+    entry_id = uuid.uuid4().hex
+    entry_key = _entry_key(version, entry_id)
+    entries_key = _entries_key(version)
+    pipe = redis_client.pipeline()
+    pipe.hset(entry_key, mapping={
+        "embedding": _encode_embedding(query_embedding),
+        "prompt": prompt,
+        "response": response,
+    })
+    pipe.expire(entry_key, settings.SEMANTIC_CACHE_TTL)
+    pipe.zadd(entries_key, {entry_id: time.time()})
+    pipe.expire(entries_key, settings.SEMANTIC_CACHE_TTL)
+    await pipe.execute()
+
+    # Evict the least recently used entries above the size limit
+    overflow = await redis_client.zcard(entries_key) - settings.SEMANTIC_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        evicted = await redis_client.zrange(entries_key, 0, overflow - 1)
+        if evicted:
+            pipe = redis_client.pipeline()
+            pipe.zrem(entries_key, *evicted)
+            pipe.delete(*[_entry_key(version, entry_id) for entry_id in evicted])
+            await pipe.execute()
+
+
+async def get_stats():
+    version = get_index_version()
+    hits, misses = await redis_client.mget(HITS_KEY, MISSES_KEY)
+    hits, misses = int(hits or 0), int(misses or 0)
+    entries = await redis_client.zcard(_entries_key(version)) if version is not None else 0
+    return {
+        "enabled": settings.SEMANTIC_CACHE_ENABLED,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        "entries": entries,
+    }
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from ..config import settings
+from ..redis_client import redis_client
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+SUMMARIZER_MODEL = "deepseek/deepseek-r1-0528-qwen3-8b:free"
+# Running summary of each session, stored next to the RedisChatMessageHistory keys
+SUMMARY_KEY_PREFIX = "chat_summary:"
+
+# Summary updates still running in the background, one per session
+_pending_updates = {}
+
+# One client for the whole process so connections to OpenRouter are pooled and reused
+summarizer = AsyncOpenAI(
+    base_url="https://openrouter.ai/api/v1",
+    api_key=settings.SUMMARIZER_API,
+    timeout=settings.SUMMARIZER_TIMEOUT,
+    max_retries=0,
+    http_client=DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.SUMMARIZER_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SUMMARIZER_MAX_CONNECTIONS,
+        )
+    ),
+)
+
+
+def truncate_messages(messages_text: str, max_chars: int = None) -> str:
+    # Keeps the end of the conversation, it is the most relevant part for the next turn
+    max_chars = max_chars or settings.SUMMARY_FALLBACK_CHARS
+    if len(messages_text) <= max_chars:
+        return messages_text
+    return "..." + messages_text[-max_chars:]
+
+
+async def summarize_messages(messages_text: str) -> str:
+    """
+    Summarizes chat messages between USER and AI. Falls back to the truncated
+    messages if the summarizer fails or does not answer within SUMMARIZER_TIMEOUT.
+    """
+    try:
+        completion = await asyncio.wait_for(
+            summarizer.chat.completions.create(
+                model=SUMMARIZER_MODEL,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": (
+                            "You are a helpful assistant that summarizes chat messages between USER and AI. "
+                            "Keep the summary concise and focused on the main topics discussed.\n"
+                            f"{messages_text}"
+                        ),
+                    }
+                ]
+            ),
+            timeout=settings.SUMMARIZER_TIMEOUT,
+        )
+        summary = completion.choices[0].message.content
+        if summary:
+            return summary
+        logger.warning("Summarizer returned an empty summary, using truncated messages")
+    except asyncio.TimeoutError:
+        logger.warning(f"Summarizer timed out after {settings.SUMMARIZER_TIMEOUT}s, using truncated messages")
+    except Exception as e:
+        logger.warning(f"Summarizer failed ({e}), using truncated messages")
+    return truncate_messages(messages_text)
+
+
+async def get_summary(session_id: str):
+    return await redis_client.get(SUMMARY_KEY_PREFIX + session_id)
+
+
+async def delete_summary(session_id: str):
+    await redis_client.delete(SUMMARY_KEY_PREFIX + session_id)
+
+
+async def update_summary(session_id: str, prompt: str, response: str, previous_update=None):
+    """Folds the latest USER/AI exchange into the running summary of the session."""
+    if previous_update is not None:
+        # Updates of one session are applied in order, each builds on the last summary
+        await asyncio.gather(previous_update, return_exceptions=True)
+    previous_summary = await get_summary(session_id)
+    messages_text = f"USER: {prompt}\nAI: {response}"
+    if previous_summary:
+        messages_text = f"SUMMARY OF EARLIER MESSAGES: {previous_summary}\n{messages_text}"
+    summary = await summarize_messages(messages_text)
+    await redis_client.set(SUMMARY_KEY_PREFIX + session_id, summary)
+    logger.info(f"Running summary updated for session {session_id}")
+
+
+def schedule_summary_update(session_id: str, prompt: str, response: str):
+    """Updates the running summary in the background so the response is not delayed."""
+    previous_update = _pending_updates.get(session_id)
+    task = asyncio.create_task(update_summary(session_id, prompt, response, previous_update))
+    _pending_updates[session_id] = task
+
+    def _done(finished_task):
+        if _pending_updates.get(session_id) is finished_task:
+            del _pending_updates[session_id]
+        if not finished_task.cancelled() and finished_task.exception():
+            logger.error(f"Updating summary for session {session_id} failed: {finished_task.exception()}")
+
+    task.add_done_callback(_done)
+    return task
+
+
+async def close_summarizer(timeout: float = 10.0):
+    # Give running summary updates a chance to finish before shutting down
+    if _pending_updates:
+        await asyncio.wait(list(_pending_updates.values()), timeout=timeout)
+    await summarizer.close()
@@ -21,6 +21,56 @@ class Settings(BaseSettings):
     REDIS_URL: str
     SUMMARIZER_API: str
     OPENAI_API_KEY: str
+    # Styling reference added to the agent prompt (UI Kit & Templates chunks)
+    STYLING_TOP_K: int = 4
+    # Token budgets of the agent prompt context: the whole context, then styling reference,
+    # retrieved docs (plus what styling and history leave unused) and chat history
+    CONTEXT_TOKEN_BUDGET: int = 6000
+    STYLING_TOKEN_BUDGET: int = 2000
+    DOCS_TOKEN_BUDGET: int = 3000
+    HISTORY_TOKEN_BUDGET: int = 800
+    # Hybrid retrieval of docs: chunks put in the prompt, candidates taken from each of the
+    # vector and BM25 searches, and an optional cross-encoder (sentence-transformers) to rerank
+    RETRIEVAL_K: int = 4
+    RETRIEVAL_CANDIDATES: int = 20
+    RERANK_MODEL: str = ""
+    # Chat history summarizer (OpenRouter)
+    SUMMARIZER_TIMEOUT: float = 10.0
+    SUMMARIZER_MAX_CONNECTIONS: int = 20
+    SUMMARY_FALLBACK_CHARS: int = 2000
+    # Embedding cache in front of Ollama (in-memory LRU entries) and texts per Ollama call
+    EMBEDDING_CACHE_SIZE: int = 10000
+    EMBEDDING_BATCH_SIZE: int = 64
+    # Index builds: parallel file loading, chunks per embedding batch, embedding batches in flight
+    INDEX_LOAD_WORKERS: int = 4
+    INDEX_EMBED_BATCH_SIZE: int = 64
+    INDEX_EMBED_CONCURRENCY: int = 4
+    # Doc scrapers: pooled connections, parallel requests per host, request timeout in seconds
+    SCRAPER_MAX_CONNECTIONS: int = 20
+    SCRAPER_PER_HOST_CONCURRENCY: int = 8
+    SCRAPER_TIMEOUT: float = 20.0
+    # Scrapers running at the same time in a scrape-all job
+    SCRAPER_WORKERS: int = 4
+    # Headless browsers shared by the scrapers, and how long to wait for a page element
+    BROWSER_POOL_SIZE: int = 3
+    BROWSER_WAIT_TIMEOUT: float = 15.0
+    # Threads for background jobs (index builds, scrapes)
+    JOB_WORKERS: int = 2
+    # Semantic response cache for code agent prompts (opt-in)
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_TTL: int = 86400
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 500
+    # Password hashing: bcrypt cost (hashes with another cost are upgraded on login), threads
+    # hashing off the event loop, and hashes allowed in flight before logins get a 503
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    # Users of authenticated requests cached in memory by id: seconds an entry lives, entries kept
+    USER_CACHE_TTL: int = 300
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    # Log a stack trace whenever the event loop is blocked longer than this (ms, 0 = off)
+    LOOP_BLOCK_THRESHOLD_MS: int = 0
     class Config:
         env_file = ".env"
 
@@ -1,8 +1,6 @@
-from selenium import webdriver
-import requests
-from bs4 import BeautifulSoup
 import logging
-from selenium.webdriver.edge.options import Options
+from .engine import fetch_pages
+from .records import page_records, write_records
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
@@ -11,31 +9,24 @@ logger = logging.getLogger()
 
 def Axios_doc_scrapper():
 
-    options = Options()
-    options.add_argument("--headless")  # Run Edge in headless mode
-    browser = webdriver.Edge(options=options)
-    browser.implicitly_wait(2)
-
     logger.info("Extracting Axios")
     url="https://www.freecodecamp.org/news/how-to-use-axios-with-react/#heading-how-to-make-a-get-request"
-    browser.get(url)
-    response=requests.get(url)
-    html_content=response.text
-    soup=BeautifulSoup(html_content,features="html.parser")
-    # removing links
-    for a in soup.find_all("a"):
-        a.decompose()
-    page_text=soup.get_text().strip('\n')
-    # Define markers for start and end
+    # A single server rendered article, no browser needed
+    [page] = fetch_pages([url])
+    html_content = page.html
+    if html_content is None:
+        raise RuntimeError(f"Could not fetch {url}")
+    records=page_records(html_content, url, "Axios")
+    # Define markers for start and end, matched against the section headings
     start_marker = "Make a GET Request"
     end_marker = "What's Next?"
-    # Find the start of the desired text
-    start_index = page_text.find(start_marker)
+    headings = [" > ".join(record["heading_path"]) for record in records]
+    # Find the first section of the desired text
+    start_index = next((i for i, heading in enumerate(headings) if start_marker in heading), 0)
     # Find the end marker beginning from start_index
-    end_index = page_text.find(end_marker, start_index)
-    filtered_text = page_text[start_index:end_index]
+    end_index = next((i for i, heading in enumerate(headings) if i > start_index and end_marker in heading), len(records))
+    filtered_records = records[start_index:end_index]
 
-    with open("app/docs_scrapers/extracted_data/Extracted_Axios.txt","w",encoding="utf-8") as f:
-        f.writelines(filtered_text)
-    logger.info("Data extraction completed and saved to Extracted_Axios.txt")
-    browser.quit()
\ No newline at end of file
+    write_records("Axios", filtered_records)
+    logger.info("Axios data extraction completed")
+    return 1
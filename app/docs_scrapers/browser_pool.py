@@ -0,0 +1,110 @@
+import queue
+import threading
+import logging
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.edge.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from ..config import settings
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+
+class BrowserPool:
+    """
+    A fixed number of headless Edge sessions shared by all scrapers. Sessions are
+    started on first use and handed back to the pool afterwards, so scrapes reuse
+    running browsers and at most `size` of them exist at any time.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._browsers = []
+
+    def _new_browser(self):
+        options = Options()
+        options.add_argument("--headless")  # Run Edge in headless mode
+        # a desktop sized window, so pages render their desktop navigation
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument("--disable-gpu")
+        browser = webdriver.Edge(options=options)
+        with self._lock:
+            self._browsers.append(browser)
+        logger.info(f"Started pooled browser ({len(self._browsers)}/{self.size})")
+        return browser
+
+    def _discard(self, browser):
+        with self._lock:
+            if browser in self._browsers:
+                self._browsers.remove(browser)
+        try:
+            browser.quit()
+        except WebDriverException:
+            pass
+
+    @contextmanager
+    def browser(self):
+        """Borrows a browser, waiting for one to be free if all are in use."""
+        self._slots.acquire()
+        browser = None
+        try:
+            try:
+                browser = self._idle.get_nowait()
+            except queue.Empty:
+                browser = self._new_browser()
+            yield browser
+        except WebDriverException:
+            # a crashed or hung session is not handed out again
+            if browser is not None:
+                self._discard(browser)
+                browser = None
+            raise
+        finally:
+            if browser is not None:
+                try:
+                    browser.get("about:blank")
+                    browser.delete_all_cookies()
+                    self._idle.put(browser)
+                except WebDriverException:
+                    self._discard(browser)
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            browsers = list(self._browsers)
+            self._browsers.clear()
+        for browser in browsers:
+            try:
+                browser.quit()
+            except WebDriverException:
+                pass
+        self._idle = queue.LifoQueue()
+
+
+browser_pool = BrowserPool(settings.BROWSER_POOL_SIZE)
+
+
+def wait_for(browser, condition, timeout: float = None):
+    """Waits until condition(browser) is truthy and returns its value."""
+    return WebDriverWait(browser, timeout or settings.BROWSER_WAIT_TIMEOUT).until(condition)
+
+
+def wait_for_element(browser, by, selector, timeout: float = None):
+    return wait_for(browser, EC.presence_of_element_located((by, selector)), timeout)
+
+
+def wait_for_clickable(browser, by, selector, timeout: float = None):
+    return wait_for(browser, EC.element_to_be_clickable((by, selector)), timeout)
+
+
+def wait_for_url_change(browser, old_url: str, timeout: float = None):
+    return wait_for(browser, EC.url_changes(old_url), timeout)
@@ -0,0 +1,106 @@
+import os
+import asyncio
+import logging
+from collections import namedtuple
+from urllib.parse import urlparse
+import httpx
+from ..config import settings
+from .http_cache import default_cache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+# html is None if the page could not be fetched; changed is False when the page is
+# the same as in the http cache (304 Not Modified or an identical body)
+Page = namedtuple("Page", ["url", "html", "changed"])
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/124.0 Safari/537.36 Edg/124.0",
+    "Accept": "text/html,application/xhtml+xml",
+}
+
+
+async def _fetch(client: httpx.AsyncClient, url: str, host_limits: dict, retries: int, cache):
+    host = urlparse(url).netloc
+    semaphore = host_limits.setdefault(host, asyncio.Semaphore(settings.SCRAPER_PER_HOST_CONCURRENCY))
+    cached = await asyncio.to_thread(cache.get, url) if cache is not None else None
+    headers = cache.conditional_headers(cached) if cache is not None else {}
+    for attempt in range(retries + 1):
+        try:
+            async with semaphore:
+                response = await client.get(url, headers=headers)
+            if response.status_code == 304 and cached is not None:
+                logger.info(f"Not modified {url}")
+                return Page(url, cached["body"], False)
+            response.raise_for_status()
+            logger.info(f"Fetched {url}")
+            if cache is None:
+                return Page(url, response.text, True)
+            body_hash = await asyncio.to_thread(
+                cache.put, url, response.text,
+                response.headers.get("ETag"), response.headers.get("Last-Modified")
+            )
+            changed = cached is None or cached.get("body_hash") != body_hash
+            return Page(url, response.text, changed)
+        except httpx.HTTPError as e:
+            if attempt == retries:
+                logger.error(f"Fetching {url} failed: {e}")
+                return Page(url, None, False)
+            # short back-off before retrying
+            await asyncio.sleep(0.5 * (attempt + 1))
+
+
+async def fetch_pages_async(urls, retries: int = 1, cache=default_cache):
+    """
+    Fetches all urls concurrently over one pooled connection per host, with at most
+    SCRAPER_PER_HOST_CONCURRENCY requests per host at a time. Pages already in the
+    http cache are fetched with a conditional request. Returns a Page per url, in
+    the order of urls. Pass cache=None to always download in full.
+    """
+    # the same page is often linked several times from a nav bar
+    unique_urls = list(dict.fromkeys(url for url in urls if url))
+    limits = httpx.Limits(
+        max_connections=settings.SCRAPER_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SCRAPER_MAX_CONNECTIONS,
+    )
+    host_limits = {}
+    async with httpx.AsyncClient(
+        headers=HEADERS,
+        limits=limits,
+        timeout=settings.SCRAPER_TIMEOUT,
+        follow_redirects=True,
+    ) as client:
+        pages = await asyncio.gather(*(_fetch(client, url, host_limits, retries, cache) for url in unique_urls))
+    changed = sum(1 for page in pages if page.changed)
+    logger.info(f"Fetched {len(pages)} pages, {changed} changed since the last scrape")
+    return pages
+
+
+def fetch_pages(urls, retries: int = 1, cache=default_cache):
+    """Sync entry point for the scrapers, which run in worker threads."""
+    return asyncio.run(fetch_pages_async(urls, retries, cache))
+
+
+def write_if_changed(path: str, content) -> bool:
+    """
+    Writes the extracted text unless the file already holds exactly this text, so an
+    unchanged source keeps its file untouched and the indexer can skip it.
+    Returns True if the file was written.
+    """
+    text = "".join(content)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            if f.read() == text:
+                logger.info(f"Nothing changed, keeping {path}")
+                return False
+    # write then rename, so an index build running at the same time never reads a
+    # half written file; the .tmp name is not picked up by the indexer's glob
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return True
@@ -0,0 +1,77 @@
+import os
+import json
+import hashlib
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+default_cache_dir = os.path.join(current_dir, "http_cache")
+
+
+class HttpCache:
+    """
+    On-disk cache of fetched pages shared by all scrapers. For every url it keeps the
+    body and the ETag / Last-Modified validators, so the next fetch can be a
+    conditional request and a 304 Not Modified reuses the stored body.
+    """
+
+    def __init__(self, cache_dir: str = default_cache_dir):
+        self.cache_dir = cache_dir
+
+    def _path(self, url: str, extension: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.{extension}")
+
+    def _write(self, path: str, content: str):
+        # write then rename, so a crash never leaves a half written entry
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def get(self, url: str):
+        """Returns the cached entry (validators, body hash and body) or None."""
+        meta_path = self._path(url, "json")
+        body_path = self._path(url, "html")
+        if not os.path.exists(meta_path) or not os.path.exists(body_path):
+            return None
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                entry = json.load(f)
+            with open(body_path, encoding="utf-8") as f:
+                entry["body"] = f.read()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry for {url}: {e}")
+            return None
+        return entry
+
+    def conditional_headers(self, entry) -> dict:
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, body: str, etag: str = None, last_modified: str = None) -> str:
+        """Stores the page and returns the hash of its body."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        body_hash = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        self._write(self._path(url, "html"), body)
+        self._write(self._path(url, "json"), json.dumps({
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "body_hash": body_hash,
+        }))
+        return body_hash
+
+
+default_cache = HttpCache()
@@ -1,11 +1,8 @@
-from selenium import webdriver
-import time
 from selenium.webdriver.common.by import By
-from selenium.webdriver.edge.options import Options
-import requests
-from bs4 import BeautifulSoup
-import re
 import logging
+from .engine import fetch_pages
+from .records import page_records, write_records
+from .browser_pool import browser_pool, wait_for_element
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,48 +15,31 @@ url="https://react.dev/reference/react/hooks"
 
 def React_docs_scrapper():
     logger.info("Extracting React documentation")
-    options = Options()
-    options.add_argument("--headless")  # Run Edge in headless mode
-    browser = webdriver.Edge(options=options)
-    browser.implicitly_wait(2)
     url = "https://react.dev/reference/react/hooks"
-    browser.get(url)
-    navbar=browser.find_element(By.CSS_SELECTOR,"nav[class='w-full pt-6 scrolling-touch lg:h-auto grow pe-0 lg:pe-5 lg:pb-16 md:pt-4 lg:pt-4 scrolling-gpu']")
-    links=navbar.find_elements(By.TAG_NAME,'a')
-    urls=[link.get_attribute('href') for link in links]
+    # the browser is only needed to discover the page urls
+    with browser_pool.browser() as browser:
+        browser.get(url)
+        navbar=wait_for_element(browser,By.CSS_SELECTOR,"nav[class='w-full pt-6 scrolling-touch lg:h-auto grow pe-0 lg:pe-5 lg:pb-16 md:pt-4 lg:pt-4 scrolling-gpu']")
+        links=navbar.find_elements(By.TAG_NAME,'a')
+        urls=[link.get_attribute('href') for link in links]
     logger.info("Extracting React documentation")
     unwanted_patterns = [
             r"Copyright © Meta Platforms, Inc.*",
             r"no uwu plzuwu\?Logo byMoreOn this page.*"
         ]
 
-    extracted_data=[]
+    records=[]
+    pages=0
 
-    for href in urls:
-        try:
-            logger.info(f"Extracting data from {href}")
-            browser.get(href)
-            time.sleep(2)
-            response=requests.get(href)
-            html_content=response.text
-            soup=BeautifulSoup(html_content,features="html.parser")
-            # removing links
-            for a in soup.find_all("a"):
-                a.decompose()
-
-            page_text=soup.get_text().strip('\n')
-            # removing unwanted patterns
-            for extracted_text in unwanted_patterns:
-                page_text = re.sub(extracted_text, "", page_text)
-
-            # storing extracted text in a file
-            extracted_data.append(page_text + "\n\n")
-            time.sleep(1)
-            logger.info("React data extraction done")
-        except:
+    for page in fetch_pages(urls):
+        html_content = page.html
+        if html_content is None:
             logger.error("React data extraction failed")
-
-    with open("app/docs_scrapers/extracted_data/Extracted_React_doc.txt","w",encoding="utf-8") as f:
-        f.writelines(extracted_data)
-
-    browser.quit()
\ No newline at end of file
+            continue
+        pages+=1
+        # one record per section, links and unwanted patterns removed
+        records.extend(page_records(html_content, page.url, "React", unwanted_patterns=unwanted_patterns))
+    logger.info("React data extraction done")
+
+    write_records("React", records)
+    return pages
@@ -0,0 +1,128 @@
+import os
+import re
+import json
+import logging
+from bs4 import BeautifulSoup, NavigableString, Comment
+from .engine import write_if_changed
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+extracted_data_dir = os.path.join(current_dir, "extracted_data")
+
+HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4}
+# Tags whose text should end with a line break, everything else is inline
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "aside", "header", "footer", "nav",
+    "li", "ul", "ol", "tr", "table", "blockquote", "dd", "dt", "dl", "br", "hr",
+    "figure", "figcaption", "h5", "h6",
+}
+# Never part of the page text
+SKIPPED_TAGS = {"script", "style", "noscript", "svg", "template"}
+
+
+def output_path(source: str) -> str:
+    # Extracted_<Source>_doc.jsonl, the indexer takes the source name from the file name
+    return os.path.join(extracted_data_dir, f"Extracted_{source}_doc.jsonl")
+
+
+def _clean_text(text: str, unwanted_patterns=()) -> str:
+    for pattern in unwanted_patterns:
+        text = re.sub(pattern, "", text)
+    text = re.sub(r"[ \t\r\f\v]+", " ", text)
+    text = re.sub(r" *\n *", "\n", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+class _PageSections:
+    """Collects the text and code of a page into one section per heading."""
+
+    def __init__(self):
+        self.heading_path = []
+        self.sections = []
+        self._start([])
+
+    def _start(self, heading_path):
+        self.current = {"heading_path": list(heading_path), "text": [], "code_blocks": []}
+        self.sections.append(self.current)
+
+    def heading(self, level: int, title: str):
+        # drop headings at the same or deeper level, then add this one
+        self.heading_path = [(lvl, text) for lvl, text in self.heading_path if lvl < level]
+        self.heading_path.append((level, title))
+        self._start([text for _, text in self.heading_path])
+
+    def text(self, text: str):
+        self.current["text"].append(text)
+
+    def code(self, code: str):
+        if code.strip():
+            self.current["code_blocks"].append(code.strip("\n"))
+
+
+def _walk(node, sections: _PageSections):
+    for child in node.children:
+        if isinstance(child, Comment):
+            continue
+        if isinstance(child, NavigableString):
+            sections.text(str(child))
+            continue
+        if child.name in SKIPPED_TAGS:
+            continue
+        if child.name in HEADINGS:
+            title = " ".join(child.get_text(" ").split())
+            if title:
+                sections.heading(HEADINGS[child.name], title)
+            continue
+        if child.name == "pre":
+            sections.code(child.get_text())
+            continue
+        _walk(child, sections)
+        if child.name in BLOCK_TAGS:
+            sections.text("\n")
+
+
+def page_records(html: str, url: str, source: str, remove_tags=("a",), unwanted_patterns=()):
+    """
+    Splits a documentation page into one record per heading section:
+    {"source", "url", "title", "heading_path", "text", "code_blocks"}.
+    Code from <pre> blocks is kept verbatim in code_blocks, outside of text.
+    """
+    soup = BeautifulSoup(html, features="html.parser")
+    title_tag = soup.find("title")
+    title = " ".join(title_tag.get_text().split()) if title_tag else ""
+    for tag_name in remove_tags:
+        for tag in soup.find_all(tag_name):
+            tag.decompose()
+
+    sections = _PageSections()
+    _walk(soup.body or soup, sections)
+
+    records = []
+    for section in sections.sections:
+        text = _clean_text("".join(section["text"]), unwanted_patterns)
+        if not text and not section["code_blocks"]:
+            continue
+        records.append({
+            "source": source,
+            "url": url,
+            "title": title,
+            "heading_path": section["heading_path"],
+            "text": text,
+            "code_blocks": section["code_blocks"],
+        })
+    return records
+
+
+def write_records(source: str, records) -> bool:
+    """Writes the records as JSON lines to the extracted file of the source."""
+    os.makedirs(extracted_data_dir, exist_ok=True)
+    path = output_path(source)
+    lines = [json.dumps(record, ensure_ascii=False) + "\n" for record in records]
+    written = write_if_changed(path, lines)
+    logger.info(f"{len(records)} records for {source} {'saved to' if written else 'unchanged in'} {path}")
+    return written
@@ -0,0 +1,83 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ..config import settings
+from .react_doc_scrapper import React_docs_scrapper
+from .tailwindcss_doc_scrapper import Tailwindcss_docs_scrapper
+from .tailwindcss_ui_kit_doc_scrapper import Tailwindcss_ui_kit_docs_scrapper
+from .react_form_doc_scrapper import React_hook_form_doc_scrapper
+from .axios_scrapper import Axios_doc_scrapper
+from .react_router_scrapper import React_router_doc_scrapper
+from .tailwindcss_templates_doc_scrapper import Tailwindcss_templates_docs_scrapper
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+# Scraper of each source, keyed by the source name used in the extracted file names
+SCRAPERS = {
+    "React": React_docs_scrapper,
+    "Tailwind": Tailwindcss_docs_scrapper,
+    "Tailwindcss-Templates": Tailwindcss_templates_docs_scrapper,
+    "Tailwind-UI-Kit": Tailwindcss_ui_kit_docs_scrapper,
+    "React-hook-form": React_hook_form_doc_scrapper,
+    "Axios": Axios_doc_scrapper,
+    "React-Router": React_router_doc_scrapper,
+}
+
+
+def _run_scraper(source: str):
+    started = time.perf_counter()
+    pages = SCRAPERS[source]()
+    return pages, round(time.perf_counter() - started, 2)
+
+
+def scrape_all(sources=None, progress=None):
+    """
+    Runs the scrapers of the given sources (all of them by default) at the same time,
+    SCRAPER_WORKERS at most. A failing scraper does not stop the others; every source
+    reports its status, page count, duration and error. Browsers are shared through
+    the browser pool, so concurrent scrapers never start more than BROWSER_POOL_SIZE.
+    """
+    sources = list(sources or SCRAPERS)
+    results = {source: {"status": "queued", "pages": None, "seconds": None, "error": None} for source in sources}
+    started = {}
+
+    def report():
+        if progress is not None:
+            progress(
+                sources_total=len(sources),
+                sources_done=sum(1 for result in results.values() if result["status"] in ("completed", "failed")),
+                sources={source: dict(result) for source, result in results.items()},
+            )
+
+    def run(source):
+        started[source] = time.perf_counter()
+        results[source]["status"] = "running"
+        report()
+        return _run_scraper(source)
+
+    report()
+    with ThreadPoolExecutor(max_workers=settings.SCRAPER_WORKERS, thread_name_prefix="scraper") as pool:
+        futures = {pool.submit(run, source): source for source in sources}
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                pages, seconds = future.result()
+                results[source].update(status="completed", pages=pages, seconds=seconds)
+                logger.info(f"Scraped {source}: {pages} pages in {seconds}s")
+            except Exception as e:
+                seconds = round(time.perf_counter() - started.get(source, time.perf_counter()), 2)
+                results[source].update(status="failed", seconds=seconds, error=str(e) or type(e).__name__)
+                logger.error(f"Scraping {source} failed: {e}")
+            report()
+
+    failed = [source for source, result in results.items() if result["status"] == "failed"]
+    return {
+        "sources": results,
+        "completed": len(sources) - len(failed),
+        "failed": failed,
+        "pages": sum(result["pages"] or 0 for result in results.values()),
+    }
@@ -1,179 +1,152 @@
-from selenium import webdriver
-import time
+from concurrent.futures import ThreadPoolExecutor
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 import logging
 from selenium.webdriver.support.ui import Select
+from .browser_pool import browser_pool, wait_for, wait_for_element, wait_for_clickable
+from .records import write_records
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
 # Get the root logger
 logger = logging.getLogger()
-# Set up Edge options for headless mode
 
-def Tailwindcss_templates_docs_scrapper():
-    browser = webdriver.Edge()
-    browser.implicitly_wait(8)
-    browser.maximize_window()
-    url = "https://tailwindcss.com/"
-    browser.get(url)
-    logger.info("Tailwind css templates documentation scraper started.")
-    browser.find_element(By.XPATH, "//a[normalize-space()='Docs']").click()
-    browser.find_element(By.XPATH, "//a[normalize-space()='Components']").click()
-
-    section = browser.find_element(By.CSS_SELECTOR, "#product-marketing-sections")
-    a_tag = section.find_elements(By.TAG_NAME, 'a')
-    urls = []
-    for a in a_tag:
-        href = a.get_attribute('href')
-        if href:
-            urls.append(href)
-
-    section = browser.find_element(By.CSS_SELECTOR, "#product-marketing-elements")
-    a_tag = section.find_elements(By.TAG_NAME, 'a')
-    for a in a_tag:
-        href = a.get_attribute('href')
-        if href:
-            urls.append(href)
-
-    section = browser.find_element(By.CSS_SELECTOR,
-                                   "section[id='product-marketing-feedback'] ul[class='grid grid-cols-1 gap-10 sm:grid-cols-2 sm:max-md:gap-x-5 lg:grid-cols-3 xl:grid-cols-4']")
-    a_tag = section.find_elements(By.TAG_NAME, 'a')
-    for a in a_tag:
-        href = a.get_attribute('href')
-        if href:
-            urls.append(href)
-
-    section = browser.find_element(By.CSS_SELECTOR, "#product-marketing-page-examples")
-    a_tag = section.find_elements(By.TAG_NAME, 'a')
-    for a in a_tag:
-        href = a.get_attribute('href')
-        if href:
-            urls.append(href)
-
-    section = browser.find_element(By.CSS_SELECTOR, "#product-application-ui-application-shells")
-    a_tag = section.find_elements(By.TAG_NAME, 'a')
-    for a in a_tag:
-        href = a.get_attribute('href')
-        if href:
-            urls.append(href)
-
-    section = browser.find_element(By.CSS_SELECTOR, "#product-application-ui-headings")
-    a_tag = section.find_elements(By.TAG_NAME, 'a')
-    for a in a_tag:
-        href = a.get_attribute('href')
-        if href:
-            urls.append(href)
-
-    section = browser.find_element(By.CSS_SELECTOR, "#product-application-ui-data-display")
-    a_tag = section.find_elements(By.TAG_NAME, 'a')
-    for a in a_tag:
-        href = a.get_attribute('href')
-        if href:
-            urls.append(href)
-
-    section = browser.find_element(By.CSS_SELECTOR, "#product-application-ui-lists")
-    a_tag = section.find_elements(By.TAG_NAME, 'a')
-    for a in a_tag:
-        href = a.get_attribute('href')
-        if href:
-            urls.append(href)
-
-    section = browser.find_element(By.CSS_SELECTOR, "#product-application-ui-forms")
-    a_tag = section.find_elements(By.TAG_NAME, 'a')
-    for a in a_tag:
-        href = a.get_attribute('href')
-        if href:
-            urls.append(href)
-
-    section = browser.find_element(By.CSS_SELECTOR, "#product-application-ui-navigation")
-    a_tag = section.find_elements(By.TAG_NAME, 'a')
-    for a in a_tag:
-        href = a.get_attribute('href')
-        if href:
-            urls.append(href)
-
-    section = browser.find_element(By.CSS_SELECTOR, "#product-application-ui-overlays")
-    a_tag = section.find_elements(By.TAG_NAME, 'a')
-    for a in a_tag:
-        href = a.get_attribute('href')
-        if href:
-            urls.append(href)
-
-    section = browser.find_element(By.CSS_SELECTOR, "#product-application-ui-elements")
-    a_tag = section.find_elements(By.TAG_NAME, 'a')
-    for a in a_tag:
-        href = a.get_attribute('href')
-        if href:
-            urls.append(href)
-
-    section = browser.find_element(By.CSS_SELECTOR, "#product-application-ui-layout")
-    a_tag = section.find_elements(By.TAG_NAME, 'a')
-    for a in a_tag:
-        href = a.get_attribute('href')
-        if href:
-            urls.append(href)
-
-    section = browser.find_element(By.CSS_SELECTOR, "#product-ecommerce-components")
-    a_tag = section.find_elements(By.TAG_NAME, 'a')
-    for a in a_tag:
-        href = a.get_attribute('href')
-        if href:
-            urls.append(href)
-
-    logger.info(f"Total URLs collected: {len(urls)}")
-    # After getting all the required links we are now going to scrape data from each page
-
-    count = 1
-    for url in urls:
-        logger.info(f"Processing URL {count}: {url}")
-        browser.get(url)
-        element_found = False
-        # button finding
-        btns = browser.find_elements(By.TAG_NAME, "button")
-        for btn in btns:
-
-            if btn.text == 'Code':
+# Sections of the components page whose links lead to a component page
+SECTION_SELECTORS = [
+    "#product-marketing-sections",
+    "#product-marketing-elements",
+    "section[id='product-marketing-feedback'] ul[class='grid grid-cols-1 gap-10 sm:grid-cols-2 sm:max-md:gap-x-5 lg:grid-cols-3 xl:grid-cols-4']",
+    "#product-marketing-page-examples",
+    "#product-application-ui-application-shells",
+    "#product-application-ui-headings",
+    "#product-application-ui-data-display",
+    "#product-application-ui-lists",
+    "#product-application-ui-forms",
+    "#product-application-ui-navigation",
+    "#product-application-ui-overlays",
+    "#product-application-ui-elements",
+    "#product-application-ui-layout",
+    "#product-ecommerce-components",
+]
+
+def visible_select(browser):
+    try:
+        for s in browser.find_elements(By.TAG_NAME, 'select'):
+            if s.is_displayed():
+                return s
+    except StaleElementReferenceException:
+        pass
+    return False
+
+
+def code_text(browser):
+    text_box = browser.find_elements(By.TAG_NAME, "pre")
+    return text_box[0].text if text_box else ""
+
+
+def rendered_code(browser):
+    # the code of the selected variant, once the <pre> has been filled in
+    try:
+        return code_text(browser)
+    except StaleElementReferenceException:
+        return ""
+
+
+def code_changed_from(previous_code):
+    # the code block re-renders after switching variant, wait until it shows new code
+    def condition(browser):
+        try:
+            code = code_text(browser)
+        except StaleElementReferenceException:
+            return False
+        return bool(code) and code != previous_code
+    return condition
+
+
+def extract_component(url):
+    """Opens a component page, switches its code to React and returns the component record."""
+    try:
+        with browser_pool.browser() as browser:
+            logger.info(f"Processing URL: {url}")
+            browser.get(url)
+            wait_for_element(browser, By.TAG_NAME, "h1")
+            # button finding
+            code_buttons = [btn for btn in browser.find_elements(By.TAG_NAME, "button") if btn.text == 'Code']
+            if not code_buttons:
+                return None
+            for btn in code_buttons:
                 btn.click()
-                element_found = True
 
-        if not element_found:
-            continue
+            # Wait for the code view to render instead of a fixed sleep
+            try:
+                select_element = wait_for(browser, visible_select)
+            except TimeoutException:
+                select_element = None
+                logger.warning("No visible <select> element found on this page.")
+
+            if select_element:
+                select = Select(select_element)
+                if select.first_selected_option.get_attribute("value") != 'react':
+                    # the <pre> can still be empty when the <select> shows up; without the
+                    # current variant's code, the first code to appear (maybe still that
+                    # variant) would be taken for the React one
+                    try:
+                        previous_code = wait_for(browser, rendered_code)
+                    except TimeoutException:
+                        previous_code = None
+                        logger.warning(f"Code did not render in time on {url}")
+                    if previous_code is not None:
+                        select.select_by_value('react')
+                        try:
+                            wait_for(browser, code_changed_from(previous_code))
+                        except TimeoutException:
+                            logger.warning(f"React code did not render in time on {url}")
+
+            # printing out the text
+            h1 = browser.find_element(By.TAG_NAME, "h1")
+            paras = browser.find_elements(By.TAG_NAME, "p")
+            paragraph = " ".join(paras[5].text.split()) if len(paras) > 5 else ""
+            code = code_text(browser)
+            logger.info(f"{h1.text} extracted")
+            return {
+                "source": "Tailwindcss-Templates",
+                "url": url,
+                "title": browser.title,
+                "heading_path": [h1.text],
+                "text": paragraph,
+                "code_blocks": [code] if code else [],
+            }
+    except Exception as e:
+        logger.error(f"Extracting {url} failed: {e}")
+        return None
 
-        time.sleep(2)
-
-        selects = browser.find_elements(By.TAG_NAME, 'select')
-        visible_select = None
-        for s in selects:
-            if s.is_displayed():
-                visible_select = s
-                break
-
-        if visible_select:
-            select = Select(visible_select)
-            options = select.options
-
-            select.select_by_value('react')
-            time.sleep(15)
-
-        else:
-            logger.warning("No visible <select> element found on this page.")
-
-        # printing out the text
-        h1 = browser.find_element(By.TAG_NAME, "h1")
-        paras = browser.find_elements(By.TAG_NAME, "p")
-        paragraph = " ".join(paras[5].text.split())
-        text_box = browser.find_elements(By.TAG_NAME, "pre")
-        logger.info(f"{h1.text} :")
-        logger.info(paragraph)
-        logger.info("code:")
-        logger.info(text_box[0].text)
-        count += 1
-
-        # Writting data to file
-        with open("app/docs_scrapers/extracted_data/Extracted_Tailwindcss-Templates_doc.txt", "a", encoding="utf-8") as f:
-            f.write(h1.text + ":" + "\n")
-            f.write(paragraph + "\n")
-            f.write("code:\n")
-            f.write(text_box[0].text + "\n")
-    browser.quit()
 
+def Tailwindcss_templates_docs_scrapper():
+    with browser_pool.browser() as browser:
+        url = "https://tailwindcss.com/"
+        browser.get(url)
+        logger.info("Tailwind css templates documentation scraper started.")
+        wait_for_clickable(browser, By.XPATH, "//a[normalize-space()='Docs']").click()
+        wait_for_clickable(browser, By.XPATH, "//a[normalize-space()='Components']").click()
+
+        urls = []
+        for selector in SECTION_SELECTORS:
+            section = wait_for_element(browser, By.CSS_SELECTOR, selector)
+            a_tag = section.find_elements(By.TAG_NAME, 'a')
+            for a in a_tag:
+                href = a.get_attribute('href')
+                if href:
+                    urls.append(href)
+
+        logger.info(f"Total URLs collected: {len(urls)}")
+
+    # After getting all the required links we are now going to scrape data from each page,
+    # one pooled browser per page so several pages render at the same time
+    with ThreadPoolExecutor(max_workers=browser_pool.size) as pool:
+        components = list(pool.map(extract_component, urls))
+
+    records = [component for component in components if component]
+    logger.info(f"Extracted {len(records)} of {len(urls)} components")
+    # Writting data to file, all components at once
+    write_records("Tailwindcss-Templates", records)
+    return len(records)
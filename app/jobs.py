@@ -0,0 +1,116 @@
+import uuid
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from .config import settings
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+# Long running sync work (index builds, scrapes) runs here instead of on the event loop
+executor = ThreadPoolExecutor(max_workers=settings.JOB_WORKERS, thread_name_prefix="job")
+
+# Jobs by id, oldest first; finished jobs are dropped once MAX_FINISHED_JOBS is reached
+jobs = OrderedDict()
+MAX_FINISHED_JOBS = 100
+# Running jobs keep a reference to their asyncio task here
+_tasks = {}
+
+
+class JobAlreadyRunning(Exception):
+    def __init__(self, job):
+        super().__init__(f"A {job['kind']} job is already running")
+        self.job = job
+
+
+def get_job(job_id: str):
+    return jobs.get(job_id)
+
+
+def find_active_job(kind: str):
+    for job in jobs.values():
+        if job["kind"] == kind and job["status"] in ("queued", "running"):
+            return job
+    return None
+
+
+def _prune_finished_jobs():
+    finished = [job_id for job_id, job in jobs.items() if job["status"] in ("completed", "failed")]
+    for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del jobs[job_id]
+
+
+def job_view(job: dict):
+    """Job as returned by the status endpoints, with elapsed time filled in."""
+    view = dict(job)
+    view["progress"] = dict(job["progress"])
+    if job["started_at"]:
+        view["elapsed_seconds"] = round((job["finished_at"] or time.time()) - job["started_at"], 2)
+    return view
+
+
+async def _run_job(job, func, args, on_complete, on_failure):
+    loop = asyncio.get_running_loop()
+    job["status"] = "running"
+    job["started_at"] = time.time()
+
+    def report(**progress):
+        # called from the worker thread with the latest counters
+        job["progress"].update(progress)
+
+    try:
+        result = await loop.run_in_executor(executor, lambda: func(*args, progress=report))
+        if on_complete is not None:
+            await on_complete(result)
+        job["result"] = result
+        job["status"] = "completed"
+        logger.info(f"Job {job['id']} ({job['kind']}) completed")
+    except Exception as e:
+        job["error"] = str(e)
+        job["status"] = "failed"
+        logger.error(f"Job {job['id']} ({job['kind']}) failed: {e}")
+        if on_failure is not None:
+            try:
+                await on_failure(e)
+            except Exception as cleanup_error:
+                logger.error(f"Cleaning up after job {job['id']} ({job['kind']}) failed: {cleanup_error}")
+    finally:
+        job["finished_at"] = time.time()
+        _tasks.pop(job["id"], None)
+
+
+def start_job(kind: str, func, *args, on_complete=None, on_failure=None):
+    """
+    Runs func(*args, progress=report) in the job thread pool and returns the job.
+    Only one job of a kind can run at a time, JobAlreadyRunning is raised otherwise.
+    on_complete is awaited on the event loop with the result of func, on_failure with
+    the exception if func (or on_complete) raised, for work that partly went through.
+    """
+    active = find_active_job(kind)
+    if active is not None:
+        raise JobAlreadyRunning(active)
+
+    job = {
+        "id": uuid.uuid4().hex,
+        "kind": kind,
+        "status": "queued",
+        "progress": {},
+        "result": None,
+        "error": None,
+        "created_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+    }
+    jobs[job["id"]] = job
+    _prune_finished_jobs()
+    _tasks[job["id"]] = asyncio.create_task(_run_job(job, func, args, on_complete, on_failure))
+    return job
+
+
+def shutdown_jobs():
+    executor.shutdown(wait=False, cancel_futures=True)
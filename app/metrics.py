@@ -0,0 +1,234 @@
+import sys
+import time
+import asyncio
+import threading
+import traceback
+import logging
+from contextlib import contextmanager
+from .config import settings
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+# Seconds, shared by every histogram: from fast redis calls up to slow LLM answers
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Every metric, in the order they are exported
+registry = []
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(labels.get(label, "") for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # per label values: [count per bucket..., sum, count]
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(label, "") for label in self.labels)
+        with self._lock:
+            series = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[position] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._values.items()):
+                for position, bound in enumerate(self.buckets):
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', bound)])} {series[position]}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', '+Inf')])} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {series[-1]}")
+        return lines
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests handled, by route template and status code.",
+    labels=("method", "route", "status"),
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "Time until the response has been sent, streaming included.",
+    labels=("method", "route"),
+)
+code_agent_stage_seconds = Histogram(
+    "code_agent_stage_seconds", "Time spent in each stage of a code agent request.",
+    labels=("stage",),
+)
+semantic_cache_lookups_total = Counter(
+    "semantic_cache_lookups_total", "Semantic cache lookups, by result (hit or miss).",
+    labels=("result",),
+)
+event_loop_stalls_total = Counter(
+    "event_loop_stalls_total", "Times the event loop was blocked longer than LOOP_BLOCK_THRESHOLD_MS.",
+)
+event_loop_stall_seconds = Histogram(
+    "event_loop_stall_seconds", "How long the event loop was blocked, for stalls above the threshold.",
+)
+
+
+def timed_stage(stage: str):
+    """Times a stage of the code agent: `with timed_stage("llm"): ...`"""
+    return code_agent_stage_seconds.time(stage=stage)
+
+
+class MetricsMiddleware:
+    """
+    Counts and times every HTTP request. Requests are labelled with their route
+    template (/agent/get-chat-history, /generate-vector/jobs/{job_id}) rather than
+    the raw path, so ids in urls do not create a series each.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            http_requests_total.inc(method=scope["method"], route=route_path, status=status_code)
+            http_request_duration_seconds.observe(time.perf_counter() - started, method=scope["method"], route=route_path)
+
+
+class LoopWatchdog:
+    """
+    Detects coroutines that block the event loop. A heartbeat task on the loop
+    updates a timestamp every few milliseconds; a background thread checks it and,
+    when the loop has not come back for LOOP_BLOCK_THRESHOLD_MS, logs the stack of
+    the loop thread, which points at the blocking call while it is still running.
+    """
+
+    def __init__(self, threshold_ms: int, interval: float = 0.01):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval
+        self._heartbeat = time.perf_counter()
+        self._loop_thread_id = None
+        self._task = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    async def _beat(self):
+        self._loop_thread_id = threading.get_ident()
+        while True:
+            before = time.perf_counter()
+            self._heartbeat = before
+            await asyncio.sleep(self.interval)
+            stall = time.perf_counter() - before - self.interval
+            if stall > self.threshold:
+                event_loop_stalls_total.inc()
+                event_loop_stall_seconds.observe(stall)
+                logger.warning(f"Event loop was blocked for {stall * 1000:.0f}ms")
+
+    def _watch(self):
+        reported = None
+        while not self._stopped.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            if time.perf_counter() - heartbeat < self.threshold or heartbeat == reported:
+                continue
+            # one stack per stall, taken while the loop thread is still stuck
+            reported = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                stack = "".join(traceback.format_stack(frame))
+                logger.warning(f"Event loop blocked for over {self.threshold * 1000:.0f}ms, loop thread is at:\n{stack}")
+
+    def start(self):
+        self._task = asyncio.create_task(self._beat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        self._stopped.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+_watchdog = None
+
+
+def start_loop_watchdog():
+    global _watchdog
+    if settings.LOOP_BLOCK_THRESHOLD_MS > 0 and _watchdog is None:
+        _watchdog = LoopWatchdog(settings.LOOP_BLOCK_THRESHOLD_MS)
+        _watchdog.start()
+        logger.info(f"Event loop watchdog started ({settings.LOOP_BLOCK_THRESHOLD_MS}ms threshold)")
+
+
+async def stop_loop_watchdog():
+    global _watchdog
+    if _watchdog is not None:
+        await _watchdog.stop()
+        _watchdog = None
@@ -0,0 +1,9 @@
+import redis.asyncio as redis
+from .config import settings
+
+# Shared async redis connection pool for everything that is not chat message history
+redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+async def close_redis():
+    await redis_client.aclose()
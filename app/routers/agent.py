@@ -1,14 +1,19 @@
-from fastapi import status,APIRouter,HTTPException,Depends,BackgroundTasks,UploadFile, File
-from app.database import get_session
+from fastapi import status,APIRouter,HTTPException,Depends,BackgroundTasks,UploadFile, File, Request
+from fastapi.responses import StreamingResponse
+from app.database import get_session, async_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select,delete
 from ..models import *
 from ..schemas import *
 from datetime import datetime
 from typing import List
-from ..agents.code_agent import code_agent as coding_agent
+from ..agents.code_agent import code_agent as coding_agent, code_agent_stream as coding_agent_stream
+from ..agents.summarizer import delete_summary
+from ..agents import semantic_cache
+from ..metrics import timed_stage
 from langchain_community.chat_message_histories import RedisChatMessageHistory
 from ..config import settings
+import json
 import logging
 from .auth.services import user_dependency
 # Configure logging
@@ -26,19 +31,14 @@ def generate_session_id(user_id:int):
     return f"{user_id}_{int(datetime.now().timestamp())}"
 
 async def store_chat(chat:ChatData,db: AsyncSession = Depends(get_session)):
-    new_chat= ChatHistory(**chat.model_dump())
-    db.add(new_chat)
-    await db.commit()
-    await db.refresh(new_chat)
+    with timed_stage("chat_db"):
+        new_chat= ChatHistory(**chat.model_dump())
+        db.add(new_chat)
+        await db.commit()
+        await db.refresh(new_chat)
 
 @router.post('/create-new-session',status_code=status.HTTP_201_CREATED)
 async def create_new_session(current_user: user_dependency, db: AsyncSession = Depends(get_session)):
-    # First validating if the user exists
-    result = await db.execute(select(User).filter(User.id == current_user.id))
-    user = result.scalars().first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-
     session_id = generate_session_id(current_user.id)
     new_session = Session(
         user_id=current_user.id,
@@ -100,6 +100,7 @@ async def delete_chat(
         await db.commit()
         redis_chat_history = RedisChatMessageHistory(session_id=session_id, url=settings.REDIS_URL)
         await redis_chat_history.aclear()
+        await delete_summary(session_id)
         logger.info(f"Chat history for session {session_id} deleted for user {current_user.id}")
 
     # Always delete session (since it exists)
@@ -109,33 +110,33 @@ async def delete_chat(
     await db.commit()
     logger.info(f"Session {session_id} deleted for user {current_user.id}")
 
-@router.post('/code-agent', status_code=status.HTTP_200_OK)
-async def code_agent(current_user: user_dependency, prompt:str, db: AsyncSession = Depends(get_session)):
-    # First validating if the user exists
-    query = await db.execute(select(User).filter(User.id == current_user.id))
-    user = query.scalars().first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-
+async def get_latest_session_id(user_id: int, db: AsyncSession):
     # Getting the latest user session id
     session= await db.execute(
-        select(Session).filter(Session.user_id == current_user.id).order_by(Session.created_at.desc()).limit(1)
+        select(Session).filter(Session.user_id == user_id).order_by(Session.created_at.desc()).limit(1)
     )
     session_obj= session.scalar_one_or_none()
     if session_obj is None:
         logger.info("No existing session found, creating a new one")
-        latest_session_id=generate_session_id(current_user.id)
+        latest_session_id=generate_session_id(user_id)
         new_session=Session(
-            user_id=current_user.id,
+            user_id=user_id,
             session_id=latest_session_id
         )
         db.add(new_session)
         await db.commit()
         await db.refresh(new_session)
-        session_id = new_session.session_id
-    else:
-        logger.info("Using existing session")
-        session_id = session_obj.session_id
+        return new_session.session_id
+    logger.info("Using existing session")
+    return session_obj.session_id
+
+def sse_event(event: str, data: dict):
+    # json encoding keeps newlines in the generated code inside a single data line
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post('/code-agent', status_code=status.HTTP_200_OK)
+async def code_agent(current_user: user_dependency, prompt:str, db: AsyncSession = Depends(get_session)):
+    session_id = await get_latest_session_id(current_user.id, db)
 
     res= await coding_agent(prompt, session_id)
     chat_data = ChatData(
@@ -149,3 +150,54 @@ async def code_agent(current_user: user_dependency, prompt:str, db: AsyncSession
     logger.info("Chat data stored in the database")
 
     return res
+
+@router.post('/code-agent/stream', status_code=status.HTTP_200_OK)
+async def code_agent_stream(current_user: user_dependency, prompt:str, request: Request, db: AsyncSession = Depends(get_session)):
+    """
+    Streams the generated code as Server-Sent Events: one `token` event per chunk and a
+    final `done` event once the chat has been stored. If the client disconnects the
+    generation is cancelled and nothing is stored; if generation fails midway an
+    `error` event ends the stream instead of `done`, and nothing is stored either.
+    """
+    session_id = await get_latest_session_id(current_user.id, db)
+    user_id = current_user.id
+
+    async def event_stream():
+        chunks = []
+        agent_stream = coding_agent_stream(prompt, session_id)
+        try:
+            async for text in agent_stream:
+                if await request.is_disconnected():
+                    logger.info(f"Client disconnected, generation for session {session_id} cancelled")
+                    return
+                chunks.append(text)
+                yield sse_event("token", {"content": text})
+        except Exception:
+            # the 200 and some tokens are already sent, tell the client why the stream ends
+            logger.exception(f"Generation for session {session_id} failed")
+            yield sse_event("error", {"detail": "Generation failed, please try again."})
+            return
+        finally:
+            await agent_stream.aclose()
+
+        # The request scoped db session may already be closed once streaming starts
+        async with async_session() as stream_db:
+            chat_data = ChatData(
+                session_id=session_id,
+                user_id=user_id,
+                prompt=prompt,
+                response="".join(chunks)
+            )
+            await store_chat(chat_data, stream_db)
+        logger.info("Chat data stored in the database")
+        yield sse_event("done", {"session_id": session_id})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get('/semantic-cache/stats', status_code=status.HTTP_200_OK)
+async def semantic_cache_stats(current_user: user_dependency):
+    return await semantic_cache.get_stats()
@@ -7,11 +7,12 @@ from starlette import status
 from fastapi.security import OAuth2PasswordRequestForm
 from app.models import User
 from app.schemas import CreateUserRequest, GoogleUser, Token, RefreshTokenRequest
-from .services import create_access_token, authenticate_user, bcrypt_context, create_refresh_token, \
+from .services import create_access_token, authenticate_user, create_refresh_token, \
     create_user_from_google_info, get_user_by_google_sub, token_expired, decode_token, user_dependency
 from app.database import get_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from .services import oauth
+from .hashing import hash_password
 from fastapi import Request
 from fastapi.responses import RedirectResponse
 from sqlalchemy import select
@@ -96,7 +97,7 @@ async def create_user(create_user_request: CreateUserRequest, db: AsyncSession =
     create_user_model = User(
         username=create_user_request.username,
         email=create_user_request.username,
-        hashed_password=bcrypt_context.hash(create_user_request.password)
+        hashed_password=await hash_password(create_user_request.password)
     )
 
     db.add(create_user_model)
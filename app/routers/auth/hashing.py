@@ -0,0 +1,86 @@
+import asyncio
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from starlette import status
+from passlib.context import CryptContext
+from app.config import settings
+from app.metrics import Counter, Histogram
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Get the root logger
+logger = logging.getLogger()
+
+#  Using the bcrypt algorithm for securely storing user passwords.
+# Hashes made with another cost are flagged for an update, see verify_password
+bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# bcrypt releases the GIL while hashing, so threads run hashes in parallel and
+# the event loop stays free for other requests
+hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+# Hashes running or waiting for a worker; past PASSWORD_HASH_MAX_PENDING requests get a 503
+_pending = 0
+
+password_hash_seconds = Histogram(
+    "password_hash_seconds", "Time spent hashing or verifying a password in the bcrypt pool, queue wait excluded.",
+    labels=("operation",),
+)
+password_hash_wait_seconds = Histogram(
+    "password_hash_wait_seconds", "Time a password hash waited for a free bcrypt worker.",
+    labels=("operation",),
+)
+password_hash_rejected_total = Counter(
+    "password_hash_rejected_total", "Password hashes refused with a 503 because the bcrypt pool was full.",
+    labels=("operation",),
+)
+password_rehashes_total = Counter(
+    "password_rehashes_total", "Stored password hashes upgraded on login after BCRYPT_ROUNDS changed.",
+)
+
+
+async def _run(operation: str, func, *args):
+    global _pending
+    if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        password_hash_rejected_total.inc(operation=operation)
+        logger.warning(f"Password hashing pool is full ({_pending} pending), rejecting {operation}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts right now, please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+    submitted = time.perf_counter()
+
+    def timed():
+        started = time.perf_counter()
+        password_hash_wait_seconds.observe(started - submitted, operation=operation)
+        try:
+            return func(*args)
+        finally:
+            password_hash_seconds.observe(time.perf_counter() - started, operation=operation)
+
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(hash_executor, timed)
+    finally:
+        _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    return await _run("hash", bcrypt_context.hash, password)
+
+
+async def verify_password(password: str, hashed_password: str):
+    """
+    Returns (valid, new_hash). new_hash is set when the password is valid but its
+    hash was made with another cost than BCRYPT_ROUNDS, and should replace it.
+    """
+    return await _run("verify", bcrypt_context.verify_and_update, password, hashed_password)
+
+
+def shutdown_hashing():
+    hash_executor.shutdown(wait=False, cancel_futures=True)
@@ -3,9 +3,8 @@ from datetime import timedelta, datetime, UTC
 from typing import Annotated
 from sqlalchemy import select
 from starlette import status
-from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session, defer
+from sqlalchemy.orm import Session
 from authlib.integrations.starlette_client import OAuth
 import os
 from jose import jwt, JWTError
@@ -15,10 +14,10 @@ from app.models import User
 from app.database import get_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.config import Config
+from .hashing import verify_password, password_rehashes_total
+from .user_cache import get_user_by_id, invalidate_user
 
 ALGORITHM = settings.ALGORITHM #It ensures secure token creation and validation for authentication and authorization.
-#  Using the bcrypt algorithm for securely storing user passwords.
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # tells FastAPI to expect a bearer token (like JWT) in the Authorization header for protected routes.
 oauth_bearer = OAuth2PasswordBearer(tokenUrl="auth/token",scheme_name="JWT")
 
@@ -48,11 +47,19 @@ oauth.register(
 async def authenticate_user(username: str, password: str, db: AsyncSession = Depends(get_session)):
     user = (await db.execute(select(User).filter(User.username == username))).scalars().first()
 
-    if not user:
+    # users signed up with Google have no password
+    if not user or not user.hashed_password:
         return False
 
-    if not bcrypt_context.verify(password, user.hashed_password):
+    valid, new_hash = await verify_password(password, user.hashed_password)
+    if not valid:
         return False
+    if new_hash:
+        # hashed with an older BCRYPT_ROUNDS, store it with the current cost
+        user.hashed_password = new_hash
+        await db.commit()
+        invalidate_user(user.id)
+        password_rehashes_total.inc()
     return user
 
 def create_access_token(username: str, user_id: int, expires_delta: timedelta):
@@ -74,21 +81,19 @@ def decode_token(token):
 async def get_current_user(token: Annotated[str, Depends(oauth_bearer)],db: AsyncSession = Depends(get_session)):
     try:
         payload = jwt.decode(token,settings.SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        user_id: int = payload.get("id")
-
-        user = (
-            await db.execute(
-                select(User)
-                .options(defer(User.hashed_password), defer(User.google_sub))
-                .filter(User.username == username)
-            )
-        ).scalars().first()
-        if username is None or user_id is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate user.")
-        return user
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate user.")
+    username: str = payload.get("sub")
+    user_id: int = payload.get("id")
+    if username is None or user_id is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate user.")
+
+    # The signature proves the claims, the user row comes from the cache by id and the
+    # db is only queried on a miss; handlers can rely on the user existing
+    user = await get_user_by_id(user_id, db)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate user.")
+    return user
 #def token_expired(token: str):  # Remove Depends annotation
 
 async def token_expired(token: str):
@@ -116,6 +121,7 @@ async def create_user_from_google_info(google_user: GoogleUser, db: AsyncSession
         #existing_user.google_sub = str(google_sub)
         existing_user.google_sub = str(google_sub)
         await db.commit()
+        invalidate_user(existing_user.id)
         return existing_user
     else:
 
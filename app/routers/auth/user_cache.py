@@ -0,0 +1,81 @@
+import time
+from collections import OrderedDict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models import User
+from app.metrics import Counter
+
+# Columns authenticated handlers get; the password hash and google sub never leave the db
+CACHED_COLUMNS = ("id", "username", "email")
+
+user_cache_lookups_total = Counter(
+    "user_cache_lookups_total", "Authenticated user lookups, by result (hit or miss).",
+    labels=("result",),
+)
+
+
+class UserCache:
+    """
+    In-memory LRU of user rows by id, each entry expiring after ttl seconds. Only
+    used from the event loop, so no lock is needed. Every worker process has its
+    own cache: invalidate() only reaches this process, the ttl bounds how long
+    another worker can serve a stale row.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # user id -> (expires at, column values)
+
+    def get(self, user_id: int):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires, values = entry
+        if expires < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return values
+
+    def put(self, user_id: int, values: dict):
+        self._entries[user_id] = (time.monotonic() + self.ttl, values)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+user_cache = UserCache(settings.USER_CACHE_TTL, settings.USER_CACHE_MAX_ENTRIES)
+
+
+async def get_user_by_id(user_id: int, db: AsyncSession):
+    """
+    The user with this id, from the cache or else from the db, or None if it does not
+    exist. Returns a new detached User every call, so handlers can not change the
+    cached row.
+    """
+    values = user_cache.get(user_id)
+    if values is None:
+        user_cache_lookups_total.inc(result="miss")
+        row = (await db.execute(
+            select(*(getattr(User, column) for column in CACHED_COLUMNS)).filter(User.id == user_id)
+        )).first()
+        if row is None:
+            return None
+        values = dict(row._mapping)
+        user_cache.put(user_id, values)
+    else:
+        user_cache_lookups_total.inc(result="hit")
+    return User(**values)
+
+
+def invalidate_user(user_id: int):
+    # call after changing a user row, so the next request reads it again
+    user_cache.invalidate(user_id)
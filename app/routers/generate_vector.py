@@ -1,18 +1,47 @@
-from fastapi import status,APIRouter,HTTPException
+from typing import List, Optional
+from fastapi import status,APIRouter,HTTPException,Query
 from app.RAG.vector_maker import vector_maker
+from app.RAG.vector_store import reload_vector_store
+from app.jobs import start_job, get_job, job_view, JobAlreadyRunning
 
 router = APIRouter(
     prefix='/generate-vector',
     tags=['vector generator']
 )
 
-@router.post('/generate-vector', status_code=status.HTTP_200_OK)
-async def generate_vector():
+INDEX_BUILD_JOB = "index-build"
+
+async def reload_if_changed(stats: dict):
+    if stats["added"] or stats["updated"] or stats["removed"]:
+        # Swap the shared handle so requests pick up the rebuilt index,
+        # the caches derived from it are rebuilt with it
+        await reload_vector_store()
+
+async def reload_after_failure(error: Exception):
+    # sources indexed before the failure are already in the db, serve them and
+    # keep the caches derived from the index (BM25, styling) in step with it
+    await reload_vector_store()
+
+@router.post('/generate-vector', status_code=status.HTTP_202_ACCEPTED)
+async def generate_vector(sources: Optional[List[str]] = Query(None)):
     """
-    Endpoint to generate vectors from scraped documentation.
+    Starts a background job that generates vectors from scraped documentation.
+    Only new or changed chunks are embedded; pass `sources` to refresh specific docs only.
+    Poll /generate-vector/jobs/{job_id} for progress.
     """
     try:
-        message=vector_maker()
-        return {"message":message}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        job = start_job(INDEX_BUILD_JOB, vector_maker, sources, on_complete=reload_if_changed,
+                        on_failure=reload_after_failure)
+    except JobAlreadyRunning as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "An index build is already running", "job_id": e.job["id"]}
+        )
+    return {"message": "Index build started", "job_id": job["id"], "status": job["status"]}
+
+@router.get('/jobs/{job_id}', status_code=status.HTTP_200_OK)
+async def get_index_job(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job_view(job)
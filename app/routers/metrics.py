@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.metrics import render_metrics
+
+router = APIRouter(
+    tags=['metrics']
+)
+
+
+@router.get('/metrics', response_class=PlainTextResponse)
+async def metrics():
+    """Request, code agent stage and event loop metrics in the Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
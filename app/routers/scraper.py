@@ -1,4 +1,7 @@
-from fastapi import status,APIRouter
+from typing import List, Optional
+from fastapi import status,APIRouter,HTTPException,Query
+from fastapi.concurrency import run_in_threadpool
+from app.jobs import start_job, get_job, job_view, JobAlreadyRunning
 # scraping functions
 from ..docs_scrapers.react_doc_scrapper import React_docs_scrapper
 from ..docs_scrapers.tailwindcss_doc_scrapper import Tailwindcss_docs_scrapper
@@ -7,52 +10,76 @@ from ..docs_scrapers.react_form_doc_scrapper import React_hook_form_doc_scrapper
 from ..docs_scrapers.axios_scrapper import Axios_doc_scrapper
 from ..docs_scrapers.react_router_scrapper import React_router_doc_scrapper
 from ..docs_scrapers.tailwindcss_templates_doc_scrapper import Tailwindcss_templates_docs_scrapper
+from ..docs_scrapers.scrape_all import scrape_all, SCRAPERS
 router = APIRouter(
     prefix='/scrape',
     tags=['scraper']
 )
 
+# Scrapers are blocking (selenium) and fetch pages with their own event loop,
+# so they always run in a worker thread
+
 @router.post("/scrape-react-docs", status_code=status.HTTP_200_OK)
 async def scrape_react_docs():
-    React_docs_scrapper()
+    await run_in_threadpool(React_docs_scrapper)
     return {"message": "React documentation scraping completed successfully."}
 
 @router.post("/scrape-tailwindcss-docs", status_code=status.HTTP_200_OK)
 async def scrape_tailwindcss_docs():
-    Tailwindcss_docs_scrapper()
+    await run_in_threadpool(Tailwindcss_docs_scrapper)
     return {"message": "Tailwind CSS documentation scraping completed successfully."}
 
 @router.post("/scrape-tailwindcss-templates-docs", status_code=status.HTTP_200_OK)
 async def scrape_tailwindcss_templates_docs():
-    Tailwindcss_templates_docs_scrapper()
+    await run_in_threadpool(Tailwindcss_templates_docs_scrapper)
     return {"message": "Tailwind CSS templates documentation scraping completed successfully."}
 
 @router.post("/scrape-tailwindcss-ui-kit-docs", status_code=status.HTTP_200_OK)
 async def scrape_tailwindcss_ui_kit_docs():
-    Tailwindcss_ui_kit_docs_scrapper()
+    await run_in_threadpool(Tailwindcss_ui_kit_docs_scrapper)
     return {"message": "Tailwind CSS UI Kit documentation scraping completed successfully."}
 
 @router.post("/scrape-react-hook-form-docs", status_code=status.HTTP_200_OK)
 async def scrape_react_hook_form_docs():
-    React_hook_form_doc_scrapper()
+    await run_in_threadpool(React_hook_form_doc_scrapper)
     return {"message": "React Hook Form documentation scraping completed successfully."}
 
 @router.post("/scrape-axios-docs", status_code=status.HTTP_200_OK)
 async def scrape_axios_docs():
-    Axios_doc_scrapper()
+    await run_in_threadpool(Axios_doc_scrapper)
     return {"message": "Axios documentation scraping completed successfully."}
 
 @router.post("/scrape-react-router-docs", status_code=status.HTTP_200_OK)
 async def scrape_react_router_docs():
-    React_router_doc_scrapper()
+    await run_in_threadpool(React_router_doc_scrapper)
     return {"message": "React Router documentation scraping completed successfully."}
-@router.post("/scrape-all-docs", status_code=status.HTTP_200_OK)
-async def scrape_all_docs():
-    React_docs_scrapper()
-    Tailwindcss_docs_scrapper()
-    Tailwindcss_templates_docs_scrapper()
-    Tailwindcss_ui_kit_docs_scrapper()
-    React_hook_form_doc_scrapper()
-    Axios_doc_scrapper()
-    React_router_doc_scrapper()
-    return {"message": "All documentation scraping completed successfully."}
+
+SCRAPE_JOB = "scrape"
+
+@router.post("/scrape-all-docs", status_code=status.HTTP_202_ACCEPTED)
+async def scrape_all_docs(sources: Optional[List[str]] = Query(None)):
+    """
+    Starts a background job that runs all scrapers (or only `sources`) concurrently.
+    Poll /scrape/jobs/{job_id} for per-source status, page counts, timing and errors.
+    """
+    unknown = [source for source in sources or [] if source not in SCRAPERS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sources: {', '.join(unknown)}. Available: {', '.join(SCRAPERS)}"
+        )
+    try:
+        job = start_job(SCRAPE_JOB, scrape_all, sources)
+    except JobAlreadyRunning as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "A scrape is already running", "job_id": e.job["id"]}
+        )
+    return {"message": "Scraping started", "job_id": job["id"], "status": job["status"]}
+
+@router.get("/jobs/{job_id}", status_code=status.HTTP_200_OK)
+async def get_scrape_job(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job_view(job)
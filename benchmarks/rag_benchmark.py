@@ -0,0 +1,188 @@
+"""
+Offline benchmark of the RAG layer.
+
+Builds a Chroma index from the fixture corpus in benchmarks/fixtures/corpus (same
+format as app/docs_scrapers/extracted_data) with vector_maker, using a deterministic
+hashing embedder instead of Ollama, then runs the labeled queries of
+benchmarks/fixtures/queries.json through the vector and the hybrid retriever.
+
+Reports recall@k, MRR, index build time, index size on disk and p50/p95 query
+latency. Nothing is fetched from the network, so runs are comparable over time.
+
+    python benchmarks/rag_benchmark.py --k 4 --repeat 5 --json results.json
+"""
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import asyncio
+import hashlib
+import argparse
+import tempfile
+
+# Settings are read at import time; the benchmark never connects to any of these
+for key, value in {
+    "DATABASE_HOSTNAME": "localhost", "DB_PORT": "5432", "DB_PASSWORD": "benchmark",
+    "DB_NAME": "benchmark", "DB_USER": "benchmark", "SECRET_KEY": "benchmark",
+    "ALGORITHM": "HS256", "GOOGLE_CLIENT_ID": "benchmark", "GOOGLE_CLIENT_SECRET": "benchmark",
+    "FRONTEND_URL": "http://localhost", "GOOGLE_REDIRECT_URI": "http://localhost",
+    "REDIS_URL": "redis://localhost:6379/0", "SUMMARIZER_API": "benchmark", "OPENAI_API_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(key, value)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from app.config import settings
+from app.RAG import vector_maker, vector_store
+from app.RAG.bm25 import tokenize
+from app.RAG.retriever import hybrid_search
+
+benchmark_dir = os.path.dirname(os.path.abspath(__file__))
+corpus_dir = os.path.join(benchmark_dir, "fixtures", "corpus")
+queries_path = os.path.join(benchmark_dir, "fixtures", "queries.json")
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Deterministic stand-in for the Ollama embedder: every term is hashed into one of
+    `dimensions` buckets with a sign, and the vector is L2 normalized. Texts sharing
+    terms end up close, which is enough to compare retrieval changes offline.
+    """
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+
+    def _embed(self, text: str):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for term in tokenize(text):
+            digest = hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "big") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def directory_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def percentile(values, share: float) -> float:
+    # nearest-rank percentile
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(share * len(ordered)) - 1)]
+
+
+def build_index(db_dir: str, embedder: Embeddings):
+    vector_maker.extracted_data_dir = corpus_dir
+    vector_maker.persistent_directory = db_dir
+    vector_maker.manifest_path = os.path.join(db_dir, "index_manifest.json")
+    vector_maker.embeddings = embedder
+    started = time.perf_counter()
+    stats = vector_maker.vector_maker()
+    return stats, time.perf_counter() - started
+
+
+async def vector_search(query: str, query_embedding, k: int):
+    return await vector_store.get_vector_store().asimilarity_search_by_vector(embedding=query_embedding, k=k)
+
+
+async def run_queries(retrieve, queries, embedder: Embeddings, k: int, repeat: int):
+    recalls, reciprocal_ranks, latencies = [], [], []
+    for item in queries:
+        # latency covers retrieval only, the stand-in embedder says nothing about Ollama
+        query_embedding = embedder.embed_query(item["query"])
+        relevant = set(item["relevant"])
+        for _ in range(repeat):
+            started = time.perf_counter()
+            docs = await retrieve(item["query"], query_embedding, k)
+            latencies.append((time.perf_counter() - started) * 1000)
+        urls = [doc.metadata.get("url") for doc in docs]
+        recalls.append(len(relevant & set(urls)) / len(relevant))
+        first_hit = next((rank for rank, url in enumerate(urls, 1) if url in relevant), None)
+        reciprocal_ranks.append(1 / first_hit if first_hit else 0.0)
+    return {
+        f"recall@{k}": round(sum(recalls) / len(recalls), 4),
+        "mrr": round(sum(reciprocal_ranks) / len(reciprocal_ranks), 4),
+        "latency_p50_ms": round(percentile(latencies, 0.50), 2),
+        "latency_p95_ms": round(percentile(latencies, 0.95), 2),
+    }
+
+
+async def run(args):
+    with open(queries_path, encoding="utf-8") as f:
+        queries = json.load(f)
+    embedder = HashingEmbeddings()
+    db_dir = tempfile.mkdtemp(prefix="rag-benchmark-")
+    try:
+        stats, build_seconds = await asyncio.to_thread(build_index, db_dir, embedder)
+        vector_store.persistent_directory = db_dir
+        vector_store.embeddings = embedder
+        await vector_store.load_vector_store()
+        # warm up the BM25 index, its build is not part of the query latency
+        await hybrid_search(queries[0]["query"], embedder.embed_query(queries[0]["query"]), args.k)
+
+        results = {
+            "corpus": {
+                "chunks": stats["added"] + stats["unchanged"],
+                "duplicates_removed": stats["exact_duplicates"] + stats["near_duplicates"],
+                "queries": len(queries),
+            },
+            "index": {
+                "build_seconds": round(build_seconds, 3),
+                "size_bytes": directory_size(db_dir),
+            },
+            "retrievers": {
+                "vector": await run_queries(vector_search, queries, embedder, args.k, args.repeat),
+                "hybrid": await run_queries(hybrid_search, queries, embedder, args.k, args.repeat),
+            },
+        }
+    finally:
+        vector_store.close_vector_store()
+        if args.keep_index:
+            print(f"Index kept in {db_dir}")
+        else:
+            shutil.rmtree(db_dir, ignore_errors=True)
+    return results
+
+
+def print_results(results: dict):
+    corpus, index = results["corpus"], results["index"]
+    print(f"Corpus: {corpus['chunks']} chunks ({corpus['duplicates_removed']} duplicates removed), {corpus['queries']} queries")
+    print(f"Index:  built in {index['build_seconds']}s, {index['size_bytes'] / 1024:.1f} KiB on disk")
+    metrics = list(next(iter(results["retrievers"].values())))
+    print(f"{'retriever':<10}" + "".join(f"{metric:>16}" for metric in metrics))
+    for name, values in results["retrievers"].items():
+        print(f"{name:<10}" + "".join(f"{values[metric]:>16}" for metric in metrics))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline retrieval quality and latency benchmark")
+    parser.add_argument("--k", type=int, default=settings.RETRIEVAL_K, help="chunks retrieved per query")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of every query for the latency figures")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--keep-index", action="store_true", help="keep the built index for inspection")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print_results(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,47 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from app.config import settings
-from app.routers import scraper,agent,generate_vector
+from app.routers import scraper,agent,generate_vector,metrics
 from app.routers.auth.auth import router as auth_router
+from app.RAG.vector_store import load_vector_store, close_vector_store, warm_index_caches
+from app.agents.context import warm_tokenizer
+from app.RAG.retriever import warm_reranker
+from app.agents.summarizer import close_summarizer
+from app.redis_client import close_redis
+from app.jobs import shutdown_jobs
+from app.routers.auth.hashing import shutdown_hashing
+from app.docs_scrapers.browser_pool import browser_pool
+from app.metrics import MetricsMiddleware, start_loop_watchdog, stop_loop_watchdog
 import logging
 
 logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
-app = FastAPI()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # started first so slow startup steps show up too
+    start_loop_watchdog()
+    # Open the vector db once and share it across all requests
+    await load_vector_store()
+    # styling reference and BM25 index
+    await warm_index_caches()
+    await warm_tokenizer()
+    await warm_reranker()
+    yield
+    shutdown_jobs()
+    shutdown_hashing()
+    # quitting browsers talks to the webdriver processes, keep it off the loop
+    await asyncio.to_thread(browser_pool.close)
+    close_vector_store()
+    await close_summarizer()
+    await close_redis()
+    await stop_loop_watchdog()
+
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://localhost.tiangolo.com",
@@ -29,6 +63,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# outermost, so its timings include the other middlewares
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")
@@ -40,5 +76,6 @@ app.include_router(auth_router)
 app.include_router(scraper.router)
 app.include_router(generate_vector.router)
 app.include_router(agent.router)
+app.include_router(metrics.router)
 
 